@@ -5,64 +5,141 @@ Automatically uploads, compiles, and starts PLC programs via REST API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
 import time
 import sys
 import os
+import random
+import hashlib
+import re
 from pathlib import Path
+from urllib.parse import urlsplit
+
+# Private jitter source seeded per process, so concurrent runs against a shared
+# OpenPLC are decorrelated without touching the global random state
+_jitter = random.Random(os.getpid() ^ time.time_ns())
+
+# Hash of the last program compiled successfully and the file name OpenPLC
+# stored it under, used to skip redundant uploads
+UPLOAD_CACHE = Path.home() / '.cache' / 'gridguard' / 'last_upload'
+
+# Hidden form fields in the upload-program response (attribute order varies)
+_PROG_FILE_RE = re.compile(rb'<input\b(?=[^>]*\bname=["\']prog_file["\'])[^>]*\bvalue=["\']([^"\']+)', re.I)
+_EPOCH_RE = re.compile(rb'<input\b(?=[^>]*\bname=["\']epoch_time["\'])[^>]*\bvalue=["\']([^"\']+)', re.I)
+
+# Runtime status markers on the dashboard page
+_RUNNING_RE = re.compile(rb'Running:|status: Running')
+_STOPPED_RE = re.compile(rb'Stopped:|status: Stopped')
+# Program file the runtime has loaded, as shown on the dashboard page
+_LOADED_FILE_RE = re.compile(rb'File:\s*(?:</b>)?\s*([\w.-]+\.st)\b', re.I)
+
+def _tail_lines(text, count):
+    """Return the last `count` lines of text without splitting the whole buffer"""
+    end = len(text.rstrip())
+    pos = end
+    for _ in range(count):
+        pos = text.rfind('\n', 0, pos)
+        if pos < 0:
+            break
+    return text[pos + 1:end].split('\n')
 
 class OpenPLCAutomator:
-    def __init__(self, base_url="http://localhost:8080", username="openplc", password="openplc"):
+    def __init__(self, base_url="http://localhost:8080", username="openplc", password="openplc", jitter=True):
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.password = password
+        self.jitter = jitter
+        self.modbus_host = urlsplit(self.base_url).hostname or 'localhost'
+        self._uploaded_file = None
         self.session = requests.Session()
         
+        # One pooled keep-alive connection to OpenPLC for the whole setup
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        
+        # Readiness probes go through a retry-free session: wait_for_openplc
+        # paces its own attempts, adapter retries would stall each refused probe
+        self._probe_session = requests.Session()
+        
+    def _backoff_sleep(self, delay):
+        """Sleep for a random fraction of delay (full jitter), or all of it if jitter is off"""
+        time.sleep(_jitter.uniform(0, delay) if self.jitter else delay)
+    
     def wait_for_openplc(self, timeout=60):
         """Wait for OpenPLC web interface to be available"""
         print(f"🕐 Waiting for OpenPLC at {self.base_url}...")
         
-        for i in range(timeout):
+        start = time.monotonic()
+        attempt = 0
+        next_report = 10
+        while time.monotonic() - start < timeout:
             try:
-                response = self.session.get(f"{self.base_url}/")
-                if response.status_code == 200:
+                response = self._probe_session.head(f"{self.base_url}/", timeout=2, allow_redirects=False)
+                if 200 <= response.status_code < 400:
                     print("✅ OpenPLC web interface is ready!")
                     return True
             except requests.exceptions.RequestException:
                 pass
             
-            if i % 10 == 0 and i > 0:
-                print(f"   Still waiting... ({i}/{timeout}s)")
-            time.sleep(1)
+            elapsed = time.monotonic() - start
+            if elapsed >= next_report:
+                print(f"   Still waiting... ({int(elapsed)}/{timeout}s)")
+                next_report += 10
+            # Exponential backoff with full jitter, never sleeping past the deadline
+            self._backoff_sleep(min(8.0, 0.25 * (2 ** attempt), max(0.0, timeout - elapsed)))
+            attempt += 1
         
         print(f"❌ OpenPLC failed to start within {timeout} seconds")
         return False
     
+    @staticmethod
+    def _redirected_to(response, target):
+        """True if response is a redirect whose Location contains target"""
+        return response.status_code in (302, 303) and target in response.headers.get('Location', '')
+    
     def login(self):
         """Login to OpenPLC and establish session"""
         print("🔐 Logging into OpenPLC...")
         
+        login_data = {
+            'username': self.username,
+            'password': self.password
+        }
+        
         try:
-            # Get login page to establish session
-            login_page = self.session.get(f"{self.base_url}/login")
+            # Post credentials directly; the session cookie is set on the 302 to
+            # /dashboard, so there is no need to follow the redirect
+            response = self.session.post(f"{self.base_url}/login", data=login_data,
+                                         allow_redirects=False, timeout=5)
+            if self._redirected_to(response, 'dashboard'):
+                print("✅ Successfully logged into OpenPLC!")
+                return True
+            
+            # Cold path: fetch the login page first to establish the session, then retry
+            login_page = self.session.get(f"{self.base_url}/login", timeout=10)
             if login_page.status_code != 200:
                 print(f"❌ Failed to access OpenPLC: {login_page.status_code}")
                 return False
             
-            # Perform login with form data
-            login_data = {
-                'username': self.username,
-                'password': self.password
-            }
+            response = self.session.post(f"{self.base_url}/login", data=login_data,
+                                         allow_redirects=False, timeout=5)
             
-            response = self.session.post(f"{self.base_url}/login", data=login_data, allow_redirects=True)
-            
-            # Check if we're at dashboard (successful login)
-            if 'dashboard' in response.url or response.status_code == 200:
+            # Check if we're sent to the dashboard (successful login)
+            if self._redirected_to(response, 'dashboard'):
                 print("✅ Successfully logged into OpenPLC!")
                 return True
             else:
                 print(f"❌ Login failed: {response.status_code}")
-                print(f"Response URL: {response.url}")
+                print(f"Redirect target: {response.headers.get('Location', '')}")
                 return False
                 
         except Exception as e:
@@ -72,12 +149,16 @@ class OpenPLCAutomator:
     def upload_and_compile_program(self, program_path, program_name="Automated Program", program_description="Uploaded via automation script"):
         """Upload and compile a PLC program"""
         try:
+            program_path = Path(program_path)
             print(f"📁 Uploading program: {program_path}")
             
-            # Step 1: Upload the file
-            with open(program_path, 'rb') as f:
-                files = {'file': f}
-                response = self.session.post(f"{self.base_url}/upload-program", files=files, timeout=30)
+            # Step 1: Upload the file (streamed from disk)
+            with program_path.open('rb') as f:
+                encoder = MultipartEncoder(fields={
+                    'file': (program_path.name, f, 'application/octet-stream')
+                })
+                response = self.session.post(f"{self.base_url}/upload-program", data=encoder,
+                                             headers={'Content-Type': encoder.content_type}, timeout=30)
             
             if response.status_code != 200:
                 print(f"❌ Upload failed: {response.status_code}")
@@ -87,33 +168,18 @@ class OpenPLCAutomator:
             
             # Step 2: Extract the uploaded filename and epoch from the response
             # The response contains a form with hidden fields for the uploaded file
-            try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.text, 'html.parser')
-                prog_file_input = soup.find('input', {'name': 'prog_file'})
-                epoch_time_input = soup.find('input', {'name': 'epoch_time'})
-            except ImportError:
-                print("⚠️  BeautifulSoup not available, using regex fallback")
-                import re
-                # Extract values using regex as fallback
-                file_match = re.search(r"name='prog_file'\s+value='([^']+)'", response.text)
-                epoch_match = re.search(r"name='epoch_time'\s+value='([^']+)'", response.text)
-                
-                if not file_match or not epoch_match:
-                    print("❌ Could not extract uploaded file information")
-                    return False
-                
-                uploaded_filename = file_match.group(1)
-                epoch_time = epoch_match.group(1)
-            else:
-                if not prog_file_input or not epoch_time_input:
-                    print("❌ Could not extract uploaded file information")
-                    return False
-                    
-                uploaded_filename = prog_file_input.get('value')
-                epoch_time = epoch_time_input.get('value')
+            file_match = _PROG_FILE_RE.search(response.content)
+            epoch_match = _EPOCH_RE.search(response.content)
+            
+            if not file_match or not epoch_match:
+                print("❌ Could not extract uploaded file information")
+                return False
+            
+            uploaded_filename = file_match.group(1).decode()
+            epoch_time = epoch_match.group(1).decode()
             
             print(f"📋 Uploaded filename: {uploaded_filename}")
+            self._uploaded_file = uploaded_filename
             
             # Step 3: Complete the upload by submitting the program info form
             upload_data = {
@@ -123,16 +189,20 @@ class OpenPLCAutomator:
                 'epoch_time': epoch_time
             }
             
-            info_response = self.session.post(f"{self.base_url}/upload-program-action", data=upload_data, timeout=30)
-            if info_response.status_code != 200:
+            info_response = self.session.post(f"{self.base_url}/upload-program-action", data=upload_data,
+                                              allow_redirects=False, timeout=30)
+            if info_response.status_code not in (200, 302, 303):
                 print(f"❌ Program info submission failed: {info_response.status_code}")
                 return False
                 
             print("✅ Program info submitted successfully")
             
-            # Step 4: The response redirects to the compilation page, follow it
+            # Step 4: The response redirects to the compilation page, request it once
             print("⚙️  Starting compilation...")
-            compile_url = f"{self.base_url}/compile-program?file={uploaded_filename}"
+            if self._redirected_to(info_response, 'compile-program'):
+                compile_url = requests.compat.urljoin(f"{self.base_url}/", info_response.headers['Location'])
+            else:
+                compile_url = f"{self.base_url}/compile-program?file={uploaded_filename}"
             compile_response = self.session.get(compile_url, timeout=10)
             
             if compile_response.status_code != 200:
@@ -144,19 +214,28 @@ class OpenPLCAutomator:
             # Step 5: Poll the compilation logs until completion
             max_wait_time = 120  # 2 minutes max
             start_time = time.time()
+            delay = 0.25
+            last_tail = None
+            log_buf = b''
             
             while time.time() - start_time < max_wait_time:
                 try:
-                    logs_response = self.session.get(f"{self.base_url}/compilation-logs", timeout=10)
-                    if logs_response.status_code == 200:
-                        logs = logs_response.text
+                    # After the first poll only ask for bytes appended since the last one
+                    headers = {'Range': f'bytes={len(log_buf)}-', 'Accept-Encoding': 'identity'} if log_buf else None
+                    logs_response = self.session.get(f"{self.base_url}/compilation-logs", headers=headers, timeout=10)
+                    if logs_response.status_code == 206:
+                        log_buf += logs_response.content
+                    elif logs_response.status_code == 200:
+                        log_buf = logs_response.content
+                    
+                    if logs_response.status_code in (200, 206, 416):
+                        logs = log_buf.decode('utf-8', errors='replace')
                         
                         if "Compilation finished successfully!" in logs:
                             print("✅ Program compiled successfully!")
                             print("📋 Compilation output:")
                             # Show last few lines
-                            lines = logs.strip().split('\n')[-10:]
-                            for line in lines:
+                            for line in _tail_lines(logs, 10):
                                 if line.strip():
                                     print(f"   {line}")
                             return True
@@ -165,19 +244,26 @@ class OpenPLCAutomator:
                             print("📋 Compilation output:")
                             print(logs)
                             return False
+                        
+                        # Still compiling, show progress
+                        i = logs.rfind('\n', 0, len(logs) - 1)
+                        last_line = logs[i + 1:].strip() if i >= 0 else logs.strip()
+                        if last_line and last_line != "loading logs...":
+                            print(f"🔄 {last_line}")
+                        
+                        # Poll quickly while the log is moving, back off while it is quiet
+                        if last_line != last_tail:
+                            delay = 0.25
+                            last_tail = last_line
                         else:
-                            # Still compiling, show progress
-                            lines = logs.strip().split('\n')
-                            if lines:
-                                last_line = lines[-1].strip()
-                                if last_line and last_line != "loading logs...":
-                                    print(f"🔄 {last_line}")
+                            delay = min(delay * 1.6, 3.0)
                     
-                    time.sleep(2)  # Wait 2 seconds before checking again
+                    self._backoff_sleep(delay)
                     
                 except Exception as e:
                     print(f"⚠️  Error checking compilation status: {e}")
-                    time.sleep(2)
+                    delay = min(delay * 1.6, 3.0)
+                    self._backoff_sleep(delay)
             
             print("❌ Compilation timed out")
             return False
@@ -199,9 +285,8 @@ class OpenPLCAutomator:
                 
                 # Wait a moment and verify Modbus server
                 print("🔌 Verifying Modbus server...")
-                time.sleep(5)
                 
-                if self.check_modbus_server():
+                if self.wait_for_modbus():
                     print("✅ Modbus server is running!")
                     return True
                 else:
@@ -231,27 +316,40 @@ class OpenPLCAutomator:
             print(f"❌ Runtime stop error: {e}")
             return False
     
-    def check_modbus_server(self):
-        """Check if Modbus server is running"""
+    def check_modbus_server(self, timeout=0.2):
+        """Check if Modbus server is running (non-blocking connect probe)"""
+        import select
         import socket
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex(('localhost', 502))
-            sock.close()
-            return result == 0
-        except:
+            sock.setblocking(False)
+            sock.connect_ex((self.modbus_host, 502))
+            _, writable, _ = select.select([], [sock], [], timeout)
+            return bool(writable) and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+        except OSError:
             return False
+        finally:
+            sock.close()
+    
+    def wait_for_modbus(self, timeout=5):
+        """Poll the Modbus port until it accepts connections or timeout expires"""
+        deadline = time.monotonic() + timeout
+        while not self.check_modbus_server():
+            if time.monotonic() >= deadline:
+                return False
+            self._backoff_sleep(0.05)
+        return True
     
     def get_runtime_status(self):
         """Get current runtime status"""
         try:
             response = self.session.get(f"{self.base_url}/dashboard")
             if response.status_code == 200:
-                # Parse status from response
-                if 'Running:' in response.text or 'status: Running' in response.text:
+                # Parse status from the raw body, no decode needed
+                body = response.content
+                if _RUNNING_RE.search(body):
                     return "running"
-                elif 'Stopped:' in response.text or 'status: Stopped' in response.text:
+                elif _STOPPED_RE.search(body):
                     return "stopped"
                 else:
                     return "unknown"
@@ -259,11 +357,26 @@ class OpenPLCAutomator:
         except:
             return "error"
     
-    def full_setup(self, program_path):
-        """Complete automated setup: upload, compile, and start"""
+    def get_loaded_program_file(self):
+        """File name of the program OpenPLC has loaded, or None if it can't be read"""
+        try:
+            response = self.session.get(f"{self.base_url}/dashboard", timeout=10)
+            if response.status_code == 200:
+                match = _LOADED_FILE_RE.search(response.content)
+                if match:
+                    return match.group(1).decode()
+        except requests.exceptions.RequestException:
+            pass
+        return None
+    
+    def full_setup(self, program_path, force=False):
+        """Complete automated setup: upload, compile, and start (force skips the upload cache)"""
         print("🚀 Starting OpenPLC automated setup...")
         print("=" * 50)
         
+        self._program = Path(program_path)
+        self._program_name = self._program.name
+        
         # Step 1: Wait for OpenPLC
         if not self.wait_for_openplc():
             return False
@@ -272,6 +385,22 @@ class OpenPLCAutomator:
         if not self.login():
             return False
         
+        # Skip upload + compile when this exact program was the last one compiled
+        program_hash = hashlib.blake2b(self._program.read_bytes() + self.base_url.encode(),
+                                       digest_size=16).hexdigest()
+        cached = UPLOAD_CACHE.read_text().split() if UPLOAD_CACHE.exists() else []
+        if not force and len(cached) == 2 and cached[0] == program_hash:
+            # The cache lives on this host and OpenPLC may have been recreated
+            # or given another program since; only trust it if the runtime
+            # still has the file our last upload was stored under
+            loaded_file = self.get_loaded_program_file()
+            if loaded_file == cached[1]:
+                print(f"♻️  Program unchanged since last upload ({loaded_file} loaded), skipping compile")
+                if self.start_runtime():
+                    return True
+            else:
+                print(f"⚠️  OpenPLC has {loaded_file or 'no known program'} loaded, not {cached[1]}; uploading again")
+        
         # Step 3: Check current status
         status = self.get_runtime_status()
         print(f"📊 Current runtime status: {status}")
@@ -284,18 +413,24 @@ class OpenPLCAutomator:
         
         # Step 5: Upload and compile program
         program_name = f"Breaker Control - {time.strftime('%Y-%m-%d %H:%M')}"
-        if not self.upload_and_compile_program(program_path, program_name, "Automated upload via REST API"):
+        if not self.upload_and_compile_program(self._program, program_name, "Automated upload via REST API"):
             return False
         
+        try:
+            UPLOAD_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            UPLOAD_CACHE.write_text(f"{program_hash} {self._uploaded_file}")
+        except OSError as e:
+            print(f"⚠️  Could not write upload cache: {e}")
+        
         # Step 6: Start runtime
         if not self.start_runtime():
             return False
         
         print("\n" + "=" * 50)
         print("🎉 OpenPLC automated setup completed successfully!")
-        print(f"📊 Program: {os.path.basename(program_path)}")
+        print(f"📊 Program: {self._program_name}")
         print(f"🌐 Web Interface: {self.base_url}")
-        print(f"🔌 Modbus Server: localhost:502")
+        print(f"🔌 Modbus Server: {self.modbus_host}:502")
         return True
 
 def main():
@@ -318,6 +453,13 @@ def main():
                        type=int, 
                        default=60,
                        help="Timeout waiting for OpenPLC (seconds)")
+    parser.add_argument("--jitter",
+                       action=argparse.BooleanOptionalAction,
+                       default=True,
+                       help="Randomize poll delays (disable with --no-jitter for single-shot runs)")
+    parser.add_argument("--force",
+                       action="store_true",
+                       help="Upload and compile even if the program matches the last upload")
     
     args = parser.parse_args()
     
@@ -328,8 +470,8 @@ def main():
         sys.exit(1)
     
     # Run automation
-    automator = OpenPLCAutomator(args.url, args.username, args.password)
-    success = automator.full_setup(str(program_path))
+    automator = OpenPLCAutomator(args.url, args.username, args.password, jitter=args.jitter)
+    success = automator.full_setup(program_path, force=args.force)
     
     sys.exit(0 if success else 1)
 
@@ -1,79 +1,136 @@
 #!/usr/bin/env python3
 """
-Simplified OpenPLC Automation Script using curl commands
-This version uses subprocess calls to curl for better compatibility
+Simplified OpenPLC Automation Script
+This version talks to OpenPLC over a single persistent HTTP session
 """
 
+import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.connection import HTTPConnection
+import shlex
+import socket
 import subprocess
 import time
 import sys
 import os
+import random
+import threading
+import re
 import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 
+# Private jitter source seeded per process, so concurrent runs against a shared
+# OpenPLC are decorrelated without touching the global random state
+_jitter = random.Random(os.getpid() ^ time.time_ns())
+
+_SUCCESS_RE = re.compile(rb'success', re.I)
+_COMPILE_OK_RE = re.compile(rb'success|compilation finished', re.I)
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets have TCP keepalive enabled"""
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
 class OpenPLCAutomator:
-    def __init__(self, base_url="http://localhost:8080", username="openplc", password="openplc"):
+    def __init__(self, base_url="http://localhost:8080", username="openplc", password="openplc", jitter=True):
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.password = password
+        self.jitter = jitter
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        adapter = KeepAliveAdapter(pool_maxsize=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
-    def wait_for_openplc(self, timeout=60):
-        """Wait for OpenPLC web interface to be available"""
+    def _backoff_sleep(self, delay, stop=None):
+        """Sleep for a random fraction of delay (full jitter), or all of it if jitter is off.
+        Returns early if the optional stop event is set."""
+        delay = _jitter.uniform(0, delay) if self.jitter else delay
+        if stop is None:
+            time.sleep(delay)
+        else:
+            stop.wait(delay)
+    
+    def wait_for_openplc(self, timeout=60, stop=None):
+        """Wait for OpenPLC web interface to be available (gives up early once stop is set)"""
         print(f"🕐 Waiting for OpenPLC at {self.base_url}...")
         
-        for i in range(timeout):
+        start = time.monotonic()
+        attempt = 0
+        next_report = 10
+        while time.monotonic() - start < timeout:
+            if stop is not None and stop.is_set():
+                return False
             try:
-                result = subprocess.run(['curl', '-s', '-f', f"{self.base_url}/"], 
-                                      capture_output=True, timeout=5)
-                if result.returncode == 0:
+                response = self.session.head(f"{self.base_url}/", timeout=2, allow_redirects=False)
+                if 200 <= response.status_code < 400:
                     print("✅ OpenPLC web interface is ready!")
                     return True
-            except:
+            except requests.exceptions.RequestException:
                 pass
             
-            if i % 10 == 0 and i > 0:
-                print(f"   Still waiting... ({i}/{timeout}s)")
-            time.sleep(1)
+            elapsed = time.monotonic() - start
+            if elapsed >= next_report:
+                print(f"   Still waiting... ({int(elapsed)}/{timeout}s)")
+                next_report += 10
+            # Exponential backoff with full jitter, never sleeping past the deadline
+            self._backoff_sleep(min(8.0, 0.25 * (2 ** attempt), max(0.0, timeout - elapsed)), stop)
+            attempt += 1
         
         print(f"❌ OpenPLC failed to start within {timeout} seconds")
         return False
     
-    def check_modbus_server(self):
-        """Check if Modbus server is running"""
+    def check_modbus_server(self, timeout=0.2):
+        """Check if Modbus server is running (non-blocking connect probe)"""
+        import select
+        import socket
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            result = subprocess.run(['nc', '-z', 'localhost', '502'], 
-                                  capture_output=True, timeout=5)
-            return result.returncode == 0
-        except:
+            sock.setblocking(False)
+            sock.connect_ex(('localhost', 502))
+            _, writable, _ = select.select([], [sock], [], timeout)
+            return bool(writable) and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+        except OSError:
             return False
+        finally:
+            sock.close()
     
     def upload_and_compile_program(self, program_path):
         """Upload and compile program using direct file operations"""
+        program_path = Path(program_path)
         print(f"📤 Preparing to upload program: {program_path}")
         
-        if not os.path.exists(program_path):
-            print(f"❌ Program file not found: {program_path}")
-            return False
-        
         # For OpenPLC, we need to copy the file to a specific location
         # and use the web interface indirectly
         print("🔧 Using alternative upload method...")
         
-        # Method 1: Try direct file copy to container
+        # Method 1: Copy into the container and compile from inside it in one exec
         try:
-            # Copy file to OpenPLC container
+            source_path = f'/usr/src/app/plc_logic/programs/{program_path.name}'
             container_path = "/var/lib/openplc/st_files/main.st"
-            result = subprocess.run([
-                'docker', 'exec', 'openplc_runtime', 
-                'cp', f'/usr/src/app/plc_logic/programs/{os.path.basename(program_path)}', 
-                container_path
-            ], capture_output=True, text=True)
+            script = (
+                f"cp {shlex.quote(source_path)} {shlex.quote(container_path)} && "
+                f"curl -sS -u {shlex.quote(f'{self.username}:{self.password}')} "
+                f"http://127.0.0.1:8080/compile-program"
+            )
+            result = subprocess.run(['docker', 'exec', 'openplc_runtime', 'sh', '-c', script],
+                                    capture_output=True, timeout=60)
             
             if result.returncode == 0:
                 print("✅ Program copied to OpenPLC container!")
-                return self.trigger_compilation()
+                if _COMPILE_OK_RE.search(result.stdout):
+                    print("✅ Compilation successful!")
+                    return True
+                print(f"❌ Compilation failed: {result.stdout[:300].decode(errors='replace')}")
+                return False
             else:
-                print(f"⚠️  Direct copy failed: {result.stderr}")
+                print(f"⚠️  Direct copy failed: {result.stderr.decode(errors='replace')}")
         except Exception as e:
             print(f"⚠️  Container copy failed: {e}")
         
@@ -82,39 +139,26 @@ class OpenPLCAutomator:
         return self.http_upload_program(program_path)
     
     def http_upload_program(self, program_path):
-        """Upload program via HTTP using curl"""
+        """Upload program via HTTP multipart form"""
         try:
-            # Read program content
-            with open(program_path, 'r') as f:
-                program_content = f.read()
-            
-            # Create temporary file for upload
-            temp_file = '/tmp/plc_upload.st'
-            with open(temp_file, 'w') as f:
-                f.write(program_content)
-            
-            # Use curl to upload with form data
-            cmd = [
-                'curl', '-s', '-X', 'POST',
-                '-u', f'{self.username}:{self.password}',
-                '-F', f'file=@{temp_file}',
-                '-F', f'st_program={program_content}',
-                f'{self.base_url}/programs'
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            # Clean up temp file
-            try:
-                os.remove(temp_file)
-            except:
-                pass
+            # Stream the program straight from disk into the request body
+            program_path = Path(program_path)
+            with program_path.open('rb') as f:
+                encoder = MultipartEncoder(fields={
+                    'file': (program_path.name, f, 'application/octet-stream')
+                })
+                response = self.session.post(
+                    f'{self.base_url}/programs',
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=30
+                )
             
-            if result.returncode == 0 and 'success' in result.stdout.lower():
+            if response.ok and _SUCCESS_RE.search(response.content):
                 print("✅ HTTP upload successful!")
                 return True
             else:
-                print(f"❌ HTTP upload failed: {result.stdout[:200]}")
+                print(f"❌ HTTP upload failed: {response.text[:200]}")
                 return False
                 
         except Exception as e:
@@ -122,27 +166,21 @@ class OpenPLCAutomator:
             return False
     
     def trigger_compilation(self):
-        """Trigger compilation using curl"""
+        """Trigger compilation over HTTP"""
         print("🔨 Triggering compilation...")
         
         try:
-            cmd = [
-                'curl', '-s', '-X', 'POST',
-                '-u', f'{self.username}:{self.password}',
-                f'{self.base_url}/compile-program'
-            ]
+            response = self.session.post(f'{self.base_url}/compile-program', timeout=30)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                if 'success' in result.stdout.lower() or 'compilation finished' in result.stdout.lower():
+            if response.ok:
+                if _COMPILE_OK_RE.search(response.content):
                     print("✅ Compilation successful!")
                     return True
                 else:
-                    print(f"❌ Compilation failed: {result.stdout[:300]}")
+                    print(f"❌ Compilation failed: {response.text[:300]}")
                     return False
             else:
-                print(f"❌ Compilation request failed: {result.stderr}")
+                print(f"❌ Compilation request failed: {response.status_code}")
                 return False
                 
         except Exception as e:
@@ -154,34 +192,27 @@ class OpenPLCAutomator:
         print("▶️  Starting PLC runtime...")
         
         try:
-            cmd = [
-                'curl', '-s', '-X', 'POST',
-                '-u', f'{self.username}:{self.password}',
-                f'{self.base_url}/start_plc'
-            ]
+            response = self.session.post(f'{self.base_url}/start_plc', timeout=15)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-            
-            if result.returncode == 0:
+            if response.ok:
                 print("✅ Runtime start command sent!")
                 
                 # Wait and check Modbus
                 print("🔌 Verifying Modbus server startup...")
-                time.sleep(5)
                 
-                # Check multiple times as Modbus might take a moment
-                for i in range(10):
+                # Poll until Modbus comes up, it might take a moment
+                deadline = time.monotonic() + 15
+                while time.monotonic() < deadline:
                     if self.check_modbus_server():
                         print("✅ Modbus server is running!")
                         return True
-                    time.sleep(1)
-                    print(f"   Checking Modbus... ({i+1}/10)")
+                    self._backoff_sleep(0.05)
                 
                 print("⚠️  Runtime started but Modbus server not detected")
                 print("    This might be normal if no program is compiled")
                 return True  # Still consider success
             else:
-                print(f"❌ Runtime start failed: {result.stderr}")
+                print(f"❌ Runtime start failed: {response.status_code}")
                 return False
                 
         except Exception as e:
@@ -193,9 +224,27 @@ class OpenPLCAutomator:
         print("🚀 Starting simplified OpenPLC setup...")
         print("=" * 50)
         
-        # Step 1: Wait for OpenPLC
-        if not self.wait_for_openplc():
-            return False
+        self._program = Path(program_path)
+        self._program_name = self._program.name
+        
+        # Step 1: Wait for OpenPLC while probing Modbus in parallel
+        stop_probe = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            http_future = executor.submit(self.wait_for_openplc, stop=stop_probe)
+            modbus_future = executor.submit(self.check_modbus_server)
+            done, _ = wait([http_future, modbus_future], return_when=FIRST_COMPLETED)
+            
+            if modbus_future in done and modbus_future.result():
+                print("✅ Runtime already working! Setup complete.")
+                return True
+            
+            if not http_future.result():
+                return False
+        finally:
+            # Stop a still-running HTTP wait instead of blocking on it
+            stop_probe.set()
+            executor.shutdown(wait=False)
         
         # Step 2: Try to start runtime first (might work if program already exists)
         print("▶️  Attempting to start runtime...")
@@ -208,7 +257,7 @@ class OpenPLCAutomator:
         
         # Step 3: Upload and compile program
         print("📤 Uploading and compiling program...")
-        if not self.upload_and_compile_program(program_path):
+        if not self.upload_and_compile_program(self._program):
             print("❌ Could not upload program automatically")
             print("📋 Manual setup required:")
             print(f"   1. Open {self.base_url}")
@@ -224,7 +273,7 @@ class OpenPLCAutomator:
         
         print("\n" + "=" * 50)
         print("🎉 Simplified OpenPLC setup completed!")
-        print(f"📊 Program: {os.path.basename(program_path)}")
+        print(f"📊 Program: {self._program_name}")
         print(f"🌐 Web Interface: {self.base_url}")
         print(f"🔌 Modbus Server: localhost:502")
         return True
@@ -243,6 +292,10 @@ def main():
                        type=int, 
                        default=60,
                        help="Timeout waiting for OpenPLC (seconds)")
+    parser.add_argument("--jitter",
+                       action=argparse.BooleanOptionalAction,
+                       default=True,
+                       help="Randomize poll delays (disable with --no-jitter for single-shot runs)")
     
     args = parser.parse_args()
     
@@ -253,8 +306,8 @@ def main():
         sys.exit(1)
     
     # Run simplified automation
-    automator = OpenPLCAutomator(args.url)
-    success = automator.simplified_setup(str(program_path))
+    automator = OpenPLCAutomator(args.url, jitter=args.jitter)
+    success = automator.simplified_setup(program_path)
     
     sys.exit(0 if success else 1)
 
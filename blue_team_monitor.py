@@ -13,25 +13,104 @@ cybersecurity monitoring of the SCADA system.
 import time
 import sys
 import os
+import atexit
+import operator
+import queue
+from collections import deque
 from datetime import datetime
+from typing import NamedTuple
 try:
     from pymodbus.client import ModbusTcpClient
 except ImportError:
     from pymodbus.client.sync import ModbusTcpClient
 import logging
+import logging.handlers
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/security_monitor.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+class AsciiFormatter(logging.Formatter):
+    """Formatter for the log file: drops emoji and other non-ASCII text"""
+
+    def format(self, record):
+        return super().format(record).encode('ascii', 'ignore').decode('ascii')
+
+def setup_logging():
+    """Log to stdout and, through a background thread, to logs/security_monitor.log"""
+    root = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        return
+
+    os.makedirs('logs', exist_ok=True)
+    file_handler = logging.FileHandler('logs/security_monitor.log', encoding='utf-8')
+    file_handler.setFormatter(AsciiFormatter('%(asctime)s,%(levelname)s,%(message)s'))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.addHandler(stream_handler)
+
+class PLCState(NamedTuple):
+    """Snapshot of the PLC's security-relevant registers and coils"""
+    cycle_counter: int
+    last_command_time: int
+    security_event_count: int
+    maintenance_override: int
+    safety_timer_preset: int
+    health_signature: int
+    covert_channel_data: int
+    circuit_breaker: bool
+    system_status_led: bool
+    fault_led: bool
+    maintenance_led: bool
+    security_alert_led: bool
+    emergency_bypass: bool
+    debug_mode: bool
+
 class PLCSecurityMonitor:
+    _SEVERITY_EMOJI = {
+        'CRITICAL': '🚨',
+        'HIGH': '⚠️',
+        'MEDIUM': '🔍',
+        'LOW': 'ℹ️'
+    }
+    _ALERT_CSV = "{},{severity},{type},{message},{value}\n"
+    # (field, threshold key(s), predicate(value, threshold), alert type,
+    #  severity, message template, alert value from state or None for field)
+    _CHECKS = (
+        ('security_event_count', 'security_event_max', operator.gt,
+         'HIGH_SECURITY_EVENTS', 'HIGH',
+         'Security event counter at {val} (threshold: {thr})', None),
+        ('maintenance_override', None, lambda v, _: v == 0xDEADBEEF,
+         'MAINTENANCE_BYPASS_ACTIVE', 'CRITICAL',
+         'Maintenance override bypass detected (0xDEADBEEF)',
+         lambda d: hex(d.maintenance_override)),
+        ('maintenance_override', None, lambda v, _: v not in (0, 0xDEADBEEF),
+         'UNAUTHORIZED_MAINTENANCE', 'HIGH',
+         'Unauthorized maintenance override value: {val:#x}',
+         lambda d: hex(d.maintenance_override)),
+        ('safety_timer_preset', ('safety_timer_min', 'safety_timer_max'),
+         lambda v, t: not t[0] <= v <= t[1],
+         'SAFETY_TIMER_MANIPULATION', 'HIGH',
+         'Safety timer preset outside normal range: {val}ms', None),
+        ('health_signature', 'expected_signature', operator.ne,
+         'SYSTEM_COMPROMISE', 'CRITICAL',
+         'System health signature corrupted: {val:#x} (expected: {thr:#x})',
+         lambda d: hex(d.health_signature)),
+        ('emergency_bypass', None, lambda v, _: v,
+         'EMERGENCY_BYPASS_ACTIVE', 'HIGH',
+         'Emergency bypass is currently active', None),
+        ('debug_mode', None, lambda v, _: v,
+         'DEBUG_MODE_ACTIVE', 'MEDIUM',
+         'Debug mode active, covert channel data: {data.covert_channel_data}',
+         lambda d: d.covert_channel_data),
+    )
+    
     def __init__(self, host='localhost', port=502):
         self.client = ModbusTcpClient(host=host, port=port)
         self.baseline_values = {}
@@ -42,9 +121,30 @@ class PLCSecurityMonitor:
             'expected_signature': 0x12345678,
             'max_command_frequency': 5  # commands per minute
         }
-        self.command_history = []
-        self.last_values = {}
+        # Bind threshold values into the check table once
+        self._checks = [
+            (field, self._threshold(key), *rest)
+            for field, key, *rest in self._CHECKS
+        ]
+        self._max_cmd_freq = self.alert_thresholds['max_command_frequency']
+        self.command_history = deque()
+        self.last_values = None
+        # Threshold-check results for the last distinct PLC state
+        self._checked_state = None
+        self._checked_alerts = []
         
+        # Alert log stays open for the monitor's lifetime (line-buffered)
+        os.makedirs('logs', exist_ok=True)
+        self._alert_fh = open('logs/security_alerts.log', 'a', buffering=1)
+        
+    def _threshold(self, key):
+        """Resolve a threshold key (or tuple of keys) from alert_thresholds"""
+        if key is None:
+            return None
+        if isinstance(key, tuple):
+            return tuple(self.alert_thresholds[k] for k in key)
+        return self.alert_thresholds[key]
+
     def connect(self):
         """Connect to the PLC"""
         if self.client.connect():
@@ -57,129 +157,73 @@ class PLCSecurityMonitor:
     def read_security_registers(self):
         """Read all security-related registers from PLC"""
         try:
-            # Read holding registers (memory data)
-            holding_registers = self.client.read_holding_registers(address=0, count=25)
+            # Read holding registers in one request; register 25 carries the
+            # first 8 coils packed as bits (see breaker_control_redteam_ready.st)
+            holding_registers = self.client.read_holding_registers(address=0, count=26)
             if holding_registers.isError():
                 logger.error(f"❌ Error reading holding registers: {holding_registers}")
                 return None
             
-            # Read coils (digital outputs)
-            coils = self.client.read_coils(address=0, count=8)
-            if coils.isError():
-                logger.error(f"❌ Error reading coils: {coils}")
-                return None
-            
             # Parse register data
             registers = holding_registers.registers
-            coil_bits = coils.bits[:8]  # Only first 8 coils
+            coil_word = registers[25]
+            if coil_word:
+                coil_bits = [bool((coil_word >> i) & 1) for i in range(7)]
+            else:
+                # Zero means either every coil is off or the program does not
+                # pack %QW25 (e.g. breaker_control_complete.st); read them directly
+                coils = self.client.read_coils(address=0, count=7)
+                if coils.isError():
+                    logger.error(f"❌ Error reading coils: {coils}")
+                    return None
+                coil_bits = [bool(b) for b in coils.bits[:7]]
             
-            return {
-                'cycle_counter': registers[0] if len(registers) > 0 else 0,
-                'last_command_time': registers[1] if len(registers) > 1 else 0,
-                'security_event_count': registers[2] if len(registers) > 2 else 0,
-                'maintenance_override': registers[3] if len(registers) > 3 else 0,
-                'safety_timer_preset': registers[4] if len(registers) > 4 else 0,
-                'health_signature': registers[5] if len(registers) > 5 else 0,
-                'covert_channel_data': registers[6] if len(registers) > 6 else 0,
-                'circuit_breaker': coil_bits[0] if len(coil_bits) > 0 else False,
-                'system_status_led': coil_bits[1] if len(coil_bits) > 1 else False,
-                'fault_led': coil_bits[2] if len(coil_bits) > 2 else False,
-                'maintenance_led': coil_bits[3] if len(coil_bits) > 3 else False,
-                'security_alert_led': coil_bits[4] if len(coil_bits) > 4 else False,
-                'emergency_bypass': coil_bits[5] if len(coil_bits) > 5 else False,
-                'debug_mode': coil_bits[6] if len(coil_bits) > 6 else False,
-            }
+            return PLCState(*registers[:7], *coil_bits)
             
         except Exception as e:
             logger.error(f"❌ Exception reading registers: {e}")
             return None
     
-    def analyze_security_events(self, current_data):
+    def analyze_security_events(self, current_data, now_ts=None):
         """Analyze current data for security threats"""
-        alerts = []
-        
         if not current_data:
-            return alerts
-        
-        # Check 1: Security Event Counter
-        sec_events = current_data.get('security_event_count', 0)
-        if sec_events > self.alert_thresholds['security_event_max']:
-            alerts.append({
-                'type': 'HIGH_SECURITY_EVENTS', 
-                'severity': 'HIGH',
-                'message': f'Security event counter at {sec_events} (threshold: {self.alert_thresholds["security_event_max"]})',
-                'value': sec_events
-            })
+            return []
         
-        # Check 2: Maintenance Override Detection
-        maint_override = current_data.get('maintenance_override', 0)
-        if maint_override == 0xDEADBEEF:
-            alerts.append({
-                'type': 'MAINTENANCE_BYPASS_ACTIVE',
-                'severity': 'CRITICAL', 
-                'message': 'Maintenance override bypass detected (0xDEADBEEF)',
-                'value': hex(maint_override)
-            })
-        elif maint_override != 0:
-            alerts.append({
-                'type': 'UNAUTHORIZED_MAINTENANCE',
-                'severity': 'HIGH',
-                'message': f'Unauthorized maintenance override value: {hex(maint_override)}',
-                'value': hex(maint_override)
-            })
-        
-        # Check 3: Safety Timer Manipulation
-        safety_timer = current_data.get('safety_timer_preset', 100)
-        if safety_timer < self.alert_thresholds['safety_timer_min'] or safety_timer > self.alert_thresholds['safety_timer_max']:
-            alerts.append({
-                'type': 'SAFETY_TIMER_MANIPULATION',
-                'severity': 'HIGH',
-                'message': f'Safety timer preset outside normal range: {safety_timer}ms',
-                'value': safety_timer
-            })
-        
-        # Check 4: System Health Signature
-        signature = current_data.get('health_signature', 0)
-        if signature != self.alert_thresholds['expected_signature']:
-            alerts.append({
-                'type': 'SYSTEM_COMPROMISE',
-                'severity': 'CRITICAL',
-                'message': f'System health signature corrupted: {hex(signature)} (expected: {hex(self.alert_thresholds["expected_signature"])})',
-                'value': hex(signature)
-            })
-        
-        # Check 5: Emergency Bypass
-        if current_data.get('emergency_bypass', False):
-            alerts.append({
-                'type': 'EMERGENCY_BYPASS_ACTIVE',
-                'severity': 'HIGH',
-                'message': 'Emergency bypass is currently active',
-                'value': True
-            })
-        
-        # Check 6: Debug Mode Activity
-        if current_data.get('debug_mode', False):
-            covert_data = current_data.get('covert_channel_data', 0)
-            alerts.append({
-                'type': 'DEBUG_MODE_ACTIVE',
-                'severity': 'MEDIUM',
-                'message': f'Debug mode active, covert channel data: {covert_data}',
-                'value': covert_data
-            })
+        # Checks 1-6: threshold table, re-evaluated only when a register or
+        # coil changed since the last poll
+        if current_data != self._checked_state:
+            checked = []
+            for field, thr, test, alert_type, severity, template, value in self._checks:
+                val = getattr(current_data, field)
+                if test(val, thr):
+                    checked.append({
+                        'type': alert_type,
+                        'severity': severity,
+                        'message': template.format(val=val, thr=thr, data=current_data),
+                        'value': val if value is None else value(current_data)
+                    })
+            self._checked_state = current_data
+            self._checked_alerts = checked
+        alerts = list(self._checked_alerts)
         
         # Check 7: Command Timing Analysis
-        last_cmd_time = current_data.get('last_command_time', 0)
-        current_time = int(time.time())
+        last_cmd_time = current_data.last_command_time
+        current_time = int(time.time() if now_ts is None else now_ts)
         
-        if last_cmd_time in self.last_values:
-            if last_cmd_time != self.last_values.get('last_command_time', 0):
+        if self.last_values is not None:
+            if last_cmd_time != self.last_values.last_command_time:
                 self.command_history.append(current_time)
                 # Keep only last 10 minutes of history
-                self.command_history = [t for t in self.command_history if current_time - t < 600]
+                while self.command_history and current_time - self.command_history[0] >= 600:
+                    self.command_history.popleft()
                 
-                # Check command frequency  
-                recent_commands = len([t for t in self.command_history if current_time - t < 60])
-                if recent_commands > self.alert_thresholds['max_command_frequency']:
+                # Check command frequency (newest entries are on the right)
+                recent_commands = 0
+                for t in reversed(self.command_history):
+                    if current_time - t >= 60:
+                        break
+                    recent_commands += 1
+                if recent_commands > self._max_cmd_freq:
                     alerts.append({
                         'type': 'HIGH_COMMAND_FREQUENCY',
                         'severity': 'MEDIUM',
@@ -189,49 +233,46 @@ class PLCSecurityMonitor:
         
         return alerts
     
-    def log_security_alert(self, alert):
+    def log_security_alert(self, alert, timestamp=None):
         """Log security alert with appropriate formatting"""
-        severity_emoji = {
-            'CRITICAL': '🚨',
-            'HIGH': '⚠️', 
-            'MEDIUM': '🔍',
-            'LOW': 'ℹ️'
-        }
-        
-        emoji = severity_emoji.get(alert['severity'], '❓')
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        emoji = self._SEVERITY_EMOJI.get(alert['severity'], '❓')
+        if timestamp is None:
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         log_message = f"{emoji} [{alert['severity']}] {alert['type']}: {alert['message']}"
         logger.warning(log_message)
         
         # Write to security log file
-        with open('logs/security_alerts.log', 'a') as f:
-            f.write(f"{timestamp},{alert['severity']},{alert['type']},{alert['message']},{alert['value']}\n")
+        self._alert_fh.write(self._ALERT_CSV.format(timestamp, **alert))
     
     def print_status_summary(self, data):
         """Print current system status"""
         if not data:
             return
         
-        status_line = f"🔐 PLC Security Status | "
-        status_line += f"Events: {data.get('security_event_count', 0):02d} | "
-        status_line += f"Breaker: {'OPEN' if data.get('circuit_breaker', False) else 'CLOSED'} | "
-        
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         # Status indicators
         indicators = []
-        if data.get('maintenance_led', False):
+        if data.maintenance_led:
             indicators.append("MAINT")
-        if data.get('fault_led', False):
+        if data.fault_led:
             indicators.append("FAULT")  
-        if data.get('security_alert_led', False):
+        if data.security_alert_led:
             indicators.append("SEC-ALERT")
-        if data.get('emergency_bypass', False):
+        if data.emergency_bypass:
             indicators.append("BYPASS")
-        if data.get('debug_mode', False):
+        if data.debug_mode:
             indicators.append("DEBUG")
-            
-        status_line += f"Flags: {','.join(indicators) if indicators else 'NORMAL'}"
-        logger.info(status_line)
+
+        parts = [
+            "🔐 PLC Security Status",
+            f"Events: {data.security_event_count:02d}",
+            f"Breaker: {'OPEN' if data.circuit_breaker else 'CLOSED'}",
+            f"Flags: {','.join(indicators) if indicators else 'NORMAL'}",
+        ]
+        logger.info(" | ".join(parts))
     
     def run_monitoring(self, interval=5):
         """Main monitoring loop"""
@@ -243,11 +284,9 @@ class PLCSecurityMonitor:
         if not self.connect():
             return
         
-        # Ensure logs directory exists
-        os.makedirs('logs', exist_ok=True)
-        
         try:
             iteration = 0
+            next_tick = time.monotonic() + interval
             while True:
                 iteration += 1
                 
@@ -255,26 +294,36 @@ class PLCSecurityMonitor:
                 current_data = self.read_security_registers()
                 
                 if current_data:
+                    # One clock read per cycle, shared by every alert
+                    now_ts = time.time()
+                    
                     # Analyze for security threats
-                    alerts = self.analyze_security_events(current_data)
+                    alerts = self.analyze_security_events(current_data, now_ts)
                     
                     # Process any alerts
                     if alerts:
                         logger.warning(f"\n🚨 SECURITY ALERTS DETECTED ({len(alerts)} total)")
+                        now_str = datetime.fromtimestamp(now_ts).strftime('%Y-%m-%d %H:%M:%S')
                         for alert in alerts:
-                            self.log_security_alert(alert)
+                            self.log_security_alert(alert, now_str)
                     
                     # Print status summary every 5 iterations (25 seconds)  
                     if iteration % 5 == 0:
                         self.print_status_summary(current_data)
                     
                     # Store values for next comparison
-                    self.last_values = current_data.copy()
+                    self.last_values = current_data
                 
                 else:
                     logger.error("❌ Failed to read PLC data")
                 
-                time.sleep(interval)
+                # Sleep to the next tick on the monotonic clock so the work
+                # above doesn't stretch the period; skip ticks already missed
+                now = time.monotonic()
+                if now >= next_tick:
+                    next_tick += ((now - next_tick) // interval + 1) * interval
+                time.sleep(next_tick - now)
+                next_tick += interval
                 
         except KeyboardInterrupt:
             logger.info("\n👋 Security monitoring stopped by user")
@@ -282,6 +331,7 @@ class PLCSecurityMonitor:
             logger.error(f"❌ Monitoring error: {e}")
         finally:
             self.client.close()
+            self._alert_fh.close()
 
 def main():
     """Main entry point"""
@@ -290,6 +340,7 @@ def main():
     print("Monitoring PLC for red team attack indicators...")
     print("Press Ctrl+C to stop\n")
     
+    setup_logging()
     monitor = PLCSecurityMonitor()
     monitor.run_monitoring()
 
@@ -62,7 +62,7 @@ if __name__ == "__main__":
     print("\nTesting simulation loop...")
     for i in range(5):
         breaker_state = (i % 2 == 0)  # Alternate between True/False
-        net.switch.loc[0, 'closed'] = breaker_state
+        net.switch.at[0, 'closed'] = breaker_state
         
         try:
             pp.runpp(net)
@@ -7,6 +7,26 @@ import subprocess
 import sys
 import time
 import importlib
+import hashlib
+import json
+import socket
+import http.client
+from pathlib import Path
+
+DOCKER_SOCKET = '/var/run/docker.sock'
+
+
+class DockerSocketConnection(http.client.HTTPConnection):
+    """HTTP connection to the Docker Engine API over its Unix socket"""
+
+    def __init__(self, path=DOCKER_SOCKET, timeout=2):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
 
 def check_and_install_packages():
     """Check if required packages are installed, install if needed"""
@@ -18,7 +38,17 @@ def check_and_install_packages():
         'numpy',
         'pandas'
     ]
-    
+
+    # A marker keyed on the package list, interpreter and environment
+    # (each venv has its own sys.prefix) skips the imports
+    key = hashlib.sha256(
+        repr(required_packages).encode() + sys.version.encode()
+        + sys.prefix.encode() + sys.executable.encode()
+    ).hexdigest()
+    marker = Path(__file__).resolve().parent / f'.deps_ok_{key[:16]}'
+    if marker.exists():
+        return
+
     missing_packages = []
     
     for package in required_packages:
@@ -38,8 +68,28 @@ def check_and_install_packages():
             print(f"❌ Failed to install packages: {e}")
             sys.exit(1)
 
+    try:
+        marker.touch()
+    except OSError:
+        pass
+
 def check_openplc_container():
     """Check if OpenPLC container is running"""
+    # Ask the Docker daemon directly; only fork the CLI if the socket is unusable
+    conn = DockerSocketConnection()
+    try:
+        conn.request('GET', '/containers/openplc_runtime/json')
+        response = conn.getresponse()
+        body = response.read()
+        if response.status == 404:
+            return False
+        if response.status == 200:
+            return json.loads(body)['State']['Status'] == 'running'
+    except (OSError, http.client.HTTPException, ValueError, KeyError):
+        pass
+    finally:
+        conn.close()
+
     try:
         result = subprocess.run(
             ['docker', 'ps', '--filter', 'name=openplc_runtime', '--format', '{{.Names}}'],
@@ -1,5 +1,6 @@
 import pandapower as pp
 from pymodbus.client import ModbusTcpClient
+import socket
 import time
 
 # --- 1. Create the Power Grid Model ---
@@ -48,6 +49,9 @@ while retry_count < max_retries and not connected:
         connected = client.connect()
         if connected:
             print("Connected to OpenPLC Modbus server successfully!")
+            # Small request/response frames: don't let Nagle hold them back
+            client.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             break
         else:
             print(f"Connection attempt {retry_count + 1} failed, retrying in 2 seconds...")
@@ -75,9 +79,19 @@ if not connected:
     exit(1)
 
 print("--- Simulation Started ---")
+
+# The breaker is the only thing that changes in this model, so solve both
+# topologies once and swap the cached result tables in on each edge.
+RESULT_TABLES = ("res_bus", "res_line", "res_trafo", "res_load", "res_ext_grid")
+solved_results = {}
+for closed in (False, True):
+    net.switch.at[0, 'closed'] = closed
+    pp.runpp(net)
+    solved_results[closed] = {table: net[table].copy() for table in RESULT_TABLES}
+
 print("Initial Grid State:")
-pp.runpp(net)
 print(net.res_line)
+solved_breaker_state = True
 
 
 # --- 3. Simulation Loop ---
@@ -86,7 +100,8 @@ while True:
         # Read the state of the 'circuit_breaker' coil (%QX0.0) from the PLC.
         # Address 0 is for the first digital output.
         # In pymodbus 3.x, read_coils takes address and count as keyword arguments
-        result = client.read_coils(address=0, count=1)
+        # Read the whole first 16-coil block so added outputs cost no extra roundtrip
+        result = client.read_coils(address=0, count=16)
         
         if result.isError():
             print(f"Error reading coils: {result}")
@@ -97,19 +112,20 @@ while True:
         print(f"Error communicating with PLC: {e}")
         breaker_state = True  # Default to closed state
 
-    # Update the simulation based on the PLC's output
-    net.switch.loc[0, 'closed'] = breaker_state
-
-    # Run the power flow calculation
-    try:
-        pp.runpp(net)
-        print("\n--- Running Power Flow ---")
-        print(f"PLC 'circuit_breaker' state (%QX0.0): {breaker_state}")
-        print("Switch Table:")
-        print(net.switch)
-        print("Power Flow Results:")
-        print(net.res_line)
-    except Exception as e:
-        print(f"Error running power flow calculation: {e}")
+    # The grid only changes when the breaker does
+    if breaker_state != solved_breaker_state:
+        # Update the simulation based on the PLC's output
+        net.switch.at[0, 'closed'] = breaker_state
+        for table, results in solved_results[breaker_state].items():
+            net[table] = results
+        solved_breaker_state = breaker_state
+        print("\n".join([
+            "\n--- Running Power Flow ---",
+            f"PLC 'circuit_breaker' state (%QX0.0): {breaker_state}",
+            "Switch Table:",
+            str(net.switch),
+            "Power Flow Results:",
+            str(net.res_line),
+        ]))
 
     time.sleep(5) # Wait for 5 seconds before the next loop
\ No newline at end of file
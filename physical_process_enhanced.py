@@ -1,23 +1,93 @@
 import pandapower as pp
 from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException
 import time
+import atexit
+import copy
 import numpy as np
-import json
+import orjson
+import struct
 from datetime import datetime
 import os # <-- ADDED: To handle file paths
+from numba import njit
+
+# Daily load profile constants (industrial and residential sine phases, hours)
+HOUR_TO_RAD = 2 * np.pi / 24
+LOAD_PHASES = np.array([6.0, 19.0])
+LOAD_BASE_MW = np.array([0.8, 0.5, 2.1])
+LOAD_MIN_MW = np.array([0.2, 0.1, 0.5])
+LOAD_Q_RATIO = np.array([0.375, 0.4, 0.38])
+SIM_STEP_S = 5
+# Consecutive failed ticks tolerated before the loop starts backing off
+FAILURES_BEFORE_BACKOFF = 3
+MAX_BACKOFF_S = 60
+
+# Binary sidecar of power_flow.log: little-endian (int64 local-time
+# microseconds since epoch, float32 loading percent) per record
+LOG_RECORD = struct.Struct('<qf')
+
+# simulation_time advances in 5 s steps and 10 s = 1 hour, so the profile
+# repeats every 48 ticks: tabulate (industrial, commercial base, residential)
+PROFILE_HOURS = (np.arange(48) * SIM_STEP_S / 10) % 24
+BUSINESS_HOURS = (PROFILE_HOURS >= 8) & (PROFILE_HOURS <= 18)
+_industrial_sin, _residential_sin = np.sin(HOUR_TO_RAD * (PROFILE_HOURS[:, None] - LOAD_PHASES)).T
+LOAD_PROFILE = np.column_stack([
+    0.7 + 0.3 * (1 + _industrial_sin),
+    np.where(BUSINESS_HOURS, 0.9, 0.3),
+    0.4 + 0.6 * (1 + _residential_sin) ** 2,
+])
+# Commercial jitter is wider during business hours
+COMMERCIAL_SIGMA = np.where(BUSINESS_HOURS, 0.02, 0.01)
+
+@njit(cache=True, fastmath=True)
+def compute_load_setpoints(factors, commercial_sigma, noise):
+    """P/Q setpoints (MW/Mvar) for the three loads from one LOAD_PROFILE row"""
+    p_mw = np.empty(3)
+    q_mvar = np.empty(3)
+    jitter = np.array([0.0, commercial_sigma * noise[0], 0.0])
+    for i in range(3):
+        p_mw[i] = max(LOAD_MIN_MW[i], LOAD_BASE_MW[i] * (factors[i] + jitter[i]) + 0.05 * noise[i + 1])
+        q_mvar[i] = p_mw[i] * LOAD_Q_RATIO[i]
+    return p_mw, q_mvar
 
 class PowerSystemHMI:
+    # Only load P/Q changes between ticks with the same breaker state
+    PF_RECYCLE = {"bus_pq": True, "trafo": False, "gen": False}
+    # Simulation-mode breaker state per 5 s tick: closed for 30s, open for 10s
+    BREAKER_SCHEDULE = (True,) * 6 + (False,) * 2
+    
     def __init__(self):
         # --- ADDED: Define log file path and ensure directory exists ---
         self.log_file = "/usr/src/app/logs/power_flow.log"
         log_dir = os.path.dirname(self.log_file)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        os.makedirs(log_dir, exist_ok=True)
         # -----------------------------------------------------------------
+        # Both logs stay open for the process lifetime. The CSV is
+        # line-buffered so readers only ever see whole lines; readers can
+        # attach the binary log without parsing text or dates
+        self._log_fp = open(self.log_file, "a", buffering=1)
+        self._log_bin = open(self.log_file + ".bin", "ab", buffering=0)
+        atexit.register(self._log_fp.close)
+        atexit.register(self._log_bin.close)
+        
+        # Shared file for the web dashboard
+        self._web_data_path = '/shared_data/scada_data.json'
+        os.makedirs(os.path.dirname(self._web_data_path), exist_ok=True)
+        
+        # Compact dashboard JSON unless SCADA_JSON_PRETTY=1 (debugging)
+        self._json_options = orjson.OPT_SERIALIZE_NUMPY
+        if os.environ.get('SCADA_JSON_PRETTY') == '1':
+            self._json_options |= orjson.OPT_INDENT_2
+        # Re-check every solve against a fresh pp.runpp if SCADA_PF_VERIFY=1
+        self._verify_pf = os.environ.get('SCADA_PF_VERIFY') == '1'
+        
+        # Latest snapshot of the PLC's first 8 output coils (%QX0.0-%QX0.7)
+        self.plc_coils = [False] * 8
         
         self.setup_power_system()
         self.connect_to_plc()
         self.simulation_time = 0
+        self._rng = np.random.default_rng()
         
     def setup_power_system(self):
         """Create a realistic power grid model with multiple measurement points"""
@@ -65,6 +135,32 @@ class PowerSystemHMI:
         # PLC-controlled circuit breaker
         self.breaker_switch = pp.create_switch(self.net, bus=self.bus_mv1, element=self.critical_line, 
                                              et="l", closed=True, name="PLC Circuit Breaker")
+        
+        # Static element metadata, aligned with the result tables, so metric
+        # extraction doesn't touch pandas row by row
+        bus_name = self.net.bus['name']
+        self._bus_names = bus_name.tolist()
+        self._bus_vn = self.net.bus['vn_kv'].to_numpy()
+        self._line_meta = list(zip(self.net.line['name'],
+                                   bus_name.loc[self.net.line['from_bus']],
+                                   bus_name.loc[self.net.line['to_bus']]))
+        self._load_meta = list(zip(self.net.load['name'], bus_name.loc[self.net.load['bus']]))
+        self._gen_meta = list(zip(self.net.gen['name'], bus_name.loc[self.net.gen['bus']]))
+        # Result tables are all-float with a fixed column layout: resolve the
+        # columns read each tick to positions once, then slice plain arrays
+        self._res_bus_cols = self.net.res_bus.columns.get_indexer(['vm_pu', 'va_degree'])
+        self._res_line_cols = self.net.res_line.columns.get_indexer(
+            ['loading_percent', 'i_from_ka', 'p_from_mw', 'q_from_mvar'])
+        self._res_gen_cols = self.net.res_gen.columns.get_indexer(['p_mw', 'q_mvar'])
+        
+        # Throwaway solve so the numba kernels are compiled before the first
+        # real tick (lightsim2grid is picked up automatically when installed)
+        self._solved_breaker_state = None
+        try:
+            pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=True)
+            self._solved_breaker_state = self.net.switch.at[0, 'closed']
+        except Exception as e:
+            print(f"Power flow warm-up failed: {e}")
     
     def connect_to_plc(self):
         """Connect to OpenPLC Modbus server"""
@@ -92,69 +188,81 @@ class PowerSystemHMI:
         """Read breaker state from PLC"""
         if not self.client:
             # Simulation mode - create dynamic breaker behavior for demo
-            # Breaker cycles: closed for 30s, open for 10s
-            cycle_time = self.simulation_time % 40
-            return cycle_time < 30
+            tick = self.simulation_time // SIM_STEP_S
+            return self.BREAKER_SCHEDULE[tick % len(self.BREAKER_SCHEDULE)]
             
         try:
-            result = self.client.read_coils(address=0, count=1)
+            # One request for the whole coil byte; other outputs are unpacked
+            # from the same response instead of costing extra roundtrips
+            result = self.client.read_coils(address=0, count=8)
             if result.isError():
                 print(f"PLC read error: {result}")
                 return True  # Default to closed
-            return result.bits[0]
+            self.plc_coils = result.bits[:8]
+            return self.plc_coils[0]
+        except ConnectionException as e:
+            # Drop the dead socket; the next read reconnects on the same client
+            print(f"PLC connection lost: {e}")
+            self.client.close()
+            return True
         except Exception as e:
             print(f"PLC communication error: {e}")
             return True
     
     def update_dynamic_loads(self):
         """Update loads with realistic time-varying patterns"""
-        # Simulate daily load patterns
-        hour_of_day = (self.simulation_time / 10) % 24  # 10 seconds = 1 hour for demo
-        
-        # Industrial load (more stable, peak during work hours)
-        industrial_factor = 0.7 + 0.3 * (1 + np.sin(2 * np.pi * (hour_of_day - 6) / 24))
-        
-        # Commercial load (peak during business hours)
-        if 8 <= hour_of_day <= 18:
-            commercial_factor = 0.9 + 0.2 * np.random.normal(0, 0.1)
-        else:
-            commercial_factor = 0.3 + 0.1 * np.random.normal(0, 0.1)
-        
-        # Residential load (peak evening)
-        residential_factor = 0.4 + 0.6 * (1 + np.sin(2 * np.pi * (hour_of_day - 19) / 24)) ** 2
+        # Daily load pattern for this tick (10 seconds = 1 hour for demo)
+        tick = (self.simulation_time // SIM_STEP_S) % len(LOAD_PROFILE)
         
-        # Add some random variation
-        noise = 0.05 * np.random.normal(0, 1, 3)
+        # Profile row, commercial jitter sigma and per-load noise
+        p_mw, q_mvar = compute_load_setpoints(LOAD_PROFILE[tick], COMMERCIAL_SIGMA[tick],
+                                              self._rng.standard_normal(4))
         
-        # Update loads
-        self.net.load.loc[0, 'p_mw'] = max(0.2, 0.8 * industrial_factor + noise[0])
-        self.net.load.loc[1, 'p_mw'] = max(0.1, 0.5 * commercial_factor + noise[1])  
-        self.net.load.loc[2, 'p_mw'] = max(0.5, 2.1 * residential_factor + noise[2])
-        
-        # Update reactive power proportionally
-        self.net.load.loc[0, 'q_mvar'] = self.net.load.loc[0, 'p_mw'] * 0.375
-        self.net.load.loc[1, 'q_mvar'] = self.net.load.loc[1, 'p_mw'] * 0.4
-        self.net.load.loc[2, 'q_mvar'] = self.net.load.loc[2, 'p_mw'] * 0.38
+        # Update loads, reactive power proportionally, as whole columns
+        self.net.load['p_mw'] = p_mw
+        self.net.load['q_mvar'] = q_mvar
     
     def run_power_flow(self):
         """Run power flow analysis and return results"""
+        breaker_state = self.net.switch.at[0, 'closed']
         try:
-            # Disable numba to avoid warnings
-            pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=False)
+            if breaker_state and breaker_state == self._solved_breaker_state:
+                # Same closed topology as the last solve: reuse its Ybus and
+                # update only the bus injections, warm-started from its voltages
+                pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=True,
+                         recycle=self.PF_RECYCLE)
+            else:
+                # Breaker moved, breaker open or last solve failed: full solve
+                # with pandapower's default init. With the breaker open the
+                # network has a second, low-voltage NR solution (Load Center 1
+                # near 0.07 pu) that DC seeds and warm starts can settle on
+                pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=True)
+            if self._verify_pf:
+                self._check_against_fresh_solve()
+            self._solved_breaker_state = breaker_state
             return True
         except Exception as e:
             print(f"Power flow convergence error: {e}")
+            self._solved_breaker_state = None
             return False
     
+    def _check_against_fresh_solve(self):
+        """Warn when the last solve differs from a fresh pp.runpp of the same net"""
+        fresh = copy.deepcopy(self.net)
+        pp.runpp(fresh, algorithm="nr", max_iteration=20, numba=True)
+        diff = np.nanmax(np.abs(fresh.res_bus.vm_pu.values - self.net.res_bus.vm_pu.values))
+        if diff > 1e-4:
+            print(f"Power flow check: bus voltages differ from a fresh solve by {diff:.4f} pu")
+    
     def get_system_metrics(self):
         """Extract key system metrics for SCADA display"""
         breaker_state = self.get_plc_breaker_state()
-        self.net.switch.loc[0, 'closed'] = breaker_state
+        self.net.switch.at[0, 'closed'] = breaker_state
         
         # Update dynamic loads
         self.update_dynamic_loads()
         
-        # Run power flow with numba disabled to avoid warnings
+        # Run power flow
         converged = self.run_power_flow()
         
         if not converged:
@@ -165,7 +273,7 @@ class PowerSystemHMI:
             'timestamp': datetime.now().isoformat(),
             'breaker_state': breaker_state,
             'breaker_status': 'CLOSED' if breaker_state else 'OPEN',
-            'system_frequency': 60.0 + np.random.normal(0, 0.02),  # Hz
+            'system_frequency': np.float32(60.0 + self._rng.normal(0, 0.02)),  # Hz
             'buses': [],
             'lines': [],
             'loads': [],
@@ -173,150 +281,166 @@ class PowerSystemHMI:
             'power_flow': {}
         }
         
-        # Bus voltages
-        for idx, bus in self.net.bus.iterrows():
-            vm_pu = self.net.res_bus.loc[idx, 'vm_pu']
-            va_degree = self.net.res_bus.loc[idx, 'va_degree']
-            
-            # Handle NaN values for isolated buses
-            if np.isnan(vm_pu):
-                vm_pu = 0.0
-            if np.isnan(va_degree):
-                va_degree = 0.0
-                
-            bus_data = {
-                'name': bus['name'],
-                'voltage_kv': bus['vn_kv'],
+        # Values are reported as float32: the solve stays float64, but the
+        # dashboard shows two decimals and float32 serializes to about half
+        # the digits
+        
+        # Bus voltages (NaN for isolated buses is reported as 0)
+        vm, va = np.nan_to_num(self.net.res_bus.to_numpy()[:, self._res_bus_cols].T).astype(np.float32)
+        metrics['buses'] = [
+            {
+                'name': name,
+                'voltage_kv': vn_kv,
                 'voltage_pu': vm_pu,
                 'angle_deg': va_degree,
-                'voltage_actual': vm_pu * bus['vn_kv']
+                'voltage_actual': actual
             }
-            metrics['buses'].append(bus_data)
+            for name, vn_kv, vm_pu, va_degree, actual in zip(
+                self._bus_names, self._bus_vn.tolist(), vm, va,
+                vm * self._bus_vn.astype(np.float32))
+        ]
         
-        # Line flows
-        for idx, line in self.net.line.iterrows():
-            if idx in self.net.res_line.index:
-                loading_percent = self.net.res_line.loc[idx, 'loading_percent']
-                
-                # Handle NaN loading percentage (occurs when line is disconnected)
-                if np.isnan(loading_percent):
-                    # When breaker is open, set loading to 0
-                    loading_percent = 0.0
-                    current_ka = 0.0
-                    p_from_mw = 0.0
-                    q_from_mvar = 0.0
-                else:
-                    current_ka = self.net.res_line.loc[idx, 'i_from_ka']
-                    p_from_mw = self.net.res_line.loc[idx, 'p_from_mw']
-                    q_from_mvar = self.net.res_line.loc[idx, 'q_from_mvar']
-                
-                line_data = {
-                    'name': line['name'],
-                    'from_bus': self.net.bus.loc[line['from_bus'], 'name'],
-                    'to_bus': self.net.bus.loc[line['to_bus'], 'name'],
-                    'p_from_mw': p_from_mw,
-                    'q_from_mvar': q_from_mvar,
-                    'loading_percent': loading_percent,
-                    'current_ka': current_ka
-                }
-                metrics['lines'].append(line_data)
+        # Line flows; NaN loading means the line is disconnected (breaker
+        # open), in which case every flow is reported as 0
+        res_line = self.net.res_line.to_numpy()[:, self._res_line_cols].astype(np.float32)
+        res_line[np.isnan(res_line[:, 0])] = 0.0
+        metrics['lines'] = [
+            {
+                'name': name,
+                'from_bus': from_bus,
+                'to_bus': to_bus,
+                'p_from_mw': p_from_mw,
+                'q_from_mvar': q_from_mvar,
+                'loading_percent': loading_percent,
+                'current_ka': current_ka
+            }
+            for (name, from_bus, to_bus), (loading_percent, current_ka, p_from_mw, q_from_mvar)
+            in zip(self._line_meta, res_line)
+        ]
         
         # Load information
-        for idx, load in self.net.load.iterrows():
-            load_data = {
-                'name': load['name'],
-                'bus': self.net.bus.loc[load['bus'], 'name'],
-                'p_mw': load['p_mw'],
-                'q_mvar': load['q_mvar']
-            }
-            metrics['loads'].append(load_data)
+        load_p = self.net.load['p_mw'].to_numpy()
+        metrics['loads'] = [
+            {'name': name, 'bus': bus, 'p_mw': p_mw, 'q_mvar': q_mvar}
+            for (name, bus), p_mw, q_mvar in zip(
+                self._load_meta, load_p.astype(np.float32),
+                self.net.load['q_mvar'].to_numpy(dtype=np.float32))
+        ]
         
         # Generator information
-        for idx, gen in self.net.gen.iterrows():
-            if idx in self.net.res_gen.index:
-                gen_data = {
-                    'name': gen['name'],
-                    'bus': self.net.bus.loc[gen['bus'], 'name'],
-                    'p_mw': self.net.res_gen.loc[idx, 'p_mw'],
-                    'q_mvar': self.net.res_gen.loc[idx, 'q_mvar']
-                }
-                metrics['generators'].append(gen_data)
+        gen_p, gen_q = self.net.res_gen.to_numpy()[:, self._res_gen_cols].T
+        metrics['generators'] = [
+            {'name': name, 'bus': bus, 'p_mw': p_mw, 'q_mvar': q_mvar}
+            for (name, bus), p_mw, q_mvar in zip(
+                self._gen_meta, gen_p.astype(np.float32), gen_q.astype(np.float32))
+        ]
         
         # Overall power flow summary
-        total_load = sum([load['p_mw'] for load in metrics['loads']])
-        total_generation = sum([gen['p_mw'] for gen in metrics['generators']])
+        total_load = float(load_p.sum())
+        total_generation = float(gen_p.sum())
+        grid_import = float(self.net.res_ext_grid.at[0, 'p_mw'])
         
         metrics['power_flow'] = {
-            'total_load_mw': total_load,
-            'total_generation_mw': total_generation,
-            'grid_import_mw': self.net.res_ext_grid.loc[0, 'p_mw'],
-            'system_losses_mw': abs(total_generation + self.net.res_ext_grid.loc[0, 'p_mw'] - total_load)
+            'total_load_mw': np.float32(total_load),
+            'total_generation_mw': np.float32(total_generation),
+            'grid_import_mw': np.float32(grid_import),
+            'system_losses_mw': np.float32(abs(total_generation + grid_import - total_load))
         }
         
         return metrics
     
+    def print_summary(self, metrics):
+        """Print a summary of one tick to the console"""
+        print(f"\n⏰ Time: {metrics['timestamp']}")
+        print(f"🔌 Breaker State: {metrics['breaker_status']}")
+        print(f"📊 Total Load: {metrics['power_flow']['total_load_mw']:.2f} MW")
+        print(f"🏭 Grid Import: {metrics['power_flow']['grid_import_mw']:.2f} MW") 
+        print(f"⚡ System Frequency: {metrics['system_frequency']:.2f} Hz")
+        
+        # Show voltage levels
+        for bus in metrics['buses'][:3]:  # Show first 3 buses
+            if bus['voltage_pu'] == 0.0:
+                print(f"   {bus['name']}: ISOLATED (breaker open)")
+            else:
+                print(f"   {bus['name']}: {bus['voltage_actual']:.1f} kV ({bus['voltage_pu']:.3f} pu)")
+        
+        critical_line = next((line for line in metrics['lines'] if line['name'] == "Critical Transmission Line"), None)
+        
+        if metrics['breaker_state'] and critical_line:
+            print(f"🔗 Critical Line: {critical_line['p_from_mw']:.2f} MW, {critical_line['loading_percent']:.1f}% loading")
+        else:
+            print(f"🔗 Critical Line: DISCONNECTED (breaker open)")
+    
+    def log_loading(self, metrics):
+        """Append the critical line loading to the anomaly detector logs"""
+        critical_line = next((line for line in metrics['lines'] if line['name'] == "Critical Transmission Line"), None)
+        if critical_line:
+            timestamp = metrics['timestamp']
+            loading_percent = critical_line['loading_percent']
+            if np.isnan(loading_percent):
+                # Log zero when breaker is open (no loading)
+                loading_percent = 0.0
+            self._log_fp.write(f"{timestamp},{loading_percent}\n")
+            ts_us = np.datetime64(timestamp, 'us').astype(np.int64)
+            self._log_bin.write(LOG_RECORD.pack(ts_us, loading_percent))
+    
+    def publish_metrics(self, metrics):
+        """Save metrics to the shared file for the web dashboard"""
+        payload = orjson.dumps(metrics, option=self._json_options)
+        # Write-then-rename so the dashboard never reads a partial file
+        tmp_path = self._web_data_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self._web_data_path)
+    
     def run_simulation(self):
         """Main simulation loop"""
         print("🚀 GridGuard SCADA Simulation Started")
         print("=" * 50)
         
-        while True:
-            try:
-                # Get system metrics
-                metrics = self.get_system_metrics()
+        # Each stage fails on its own; the network, PLC client and numba
+        # kernels survive errors, and repeated failures only stretch the
+        # tick interval
+        consecutive_failures = 0
+        try:
+            while True:
+                ok = True
+                try:
+                    metrics = self.get_system_metrics()
+                except Exception as e:
+                    print(f"❌ Simulation error: {e}")
+                    metrics = None
                 
-                if metrics:
-                    # Print summary to console
-                    print(f"\n⏰ Time: {metrics['timestamp']}")
-                    print(f"🔌 Breaker State: {metrics['breaker_status']}")
-                    print(f"📊 Total Load: {metrics['power_flow']['total_load_mw']:.2f} MW")
-                    print(f"🏭 Grid Import: {metrics['power_flow']['grid_import_mw']:.2f} MW") 
-                    print(f"⚡ System Frequency: {metrics['system_frequency']:.2f} Hz")
-                    
-                    # Show voltage levels
-                    for bus in metrics['buses'][:3]:  # Show first 3 buses
-                        if bus['voltage_pu'] == 0.0:
-                            print(f"   {bus['name']}: ISOLATED (breaker open)")
-                        else:
-                            print(f"   {bus['name']}: {bus['voltage_actual']:.1f} kV ({bus['voltage_pu']:.3f} pu)")
-                    
-                    critical_line = next((line for line in metrics['lines'] if line['name'] == "Critical Transmission Line"), None)
+                if metrics is None:
+                    # Raised, or the power flow did not converge
+                    ok = False
+                else:
+                    self.print_summary(metrics)
                     
-                    if metrics['breaker_state'] and critical_line:
-                        print(f"🔗 Critical Line: {critical_line['p_from_mw']:.2f} MW, {critical_line['loading_percent']:.1f}% loading")
-                    else:
-                        print(f"🔗 Critical Line: DISCONNECTED (breaker open)")
+                    try:
+                        self.log_loading(metrics)
+                    except OSError as e:
+                        print(f"❌ Log write error: {e}")
+                        ok = False
                     
-                    # --- ADDED: Log data for the anomaly detector ---
-                    critical_line = next((line for line in metrics['lines'] if line['name'] == "Critical Transmission Line"), None)
-                    if critical_line and not np.isnan(critical_line['loading_percent']):
-                        timestamp = metrics['timestamp']
-                        loading_percent = critical_line['loading_percent']
-                        with open(self.log_file, "a") as f:
-                            f.write(f"{timestamp},{loading_percent}\n")
-                    elif critical_line and np.isnan(critical_line['loading_percent']):
-                        # Log zero when breaker is open (no loading)
-                        timestamp = metrics['timestamp']
-                        with open(self.log_file, "a") as f:
-                            f.write(f"{timestamp},0.0\n")
-                    # ---------------------------------------------------
-
-                    # Save to shared file for web dashboard
-                    # Ensure the directory exists before writing
-                    web_data_path = '/shared_data/scada_data.json'
-                    os.makedirs(os.path.dirname(web_data_path), exist_ok=True)
-                    with open(web_data_path, 'w') as f:
-                        json.dump(metrics, f, indent=2)
+                    try:
+                        self.publish_metrics(metrics)
+                    except (OSError, orjson.JSONEncodeError) as e:
+                        print(f"❌ Dashboard data write error: {e}")
+                        ok = False
                 
+                consecutive_failures = 0 if ok else consecutive_failures + 1
                 self.simulation_time += 5
-                time.sleep(5)  # Update every 5 seconds
-                
-            except KeyboardInterrupt:
-                print("\n🛑 Simulation stopped by user")
-                break
-            except Exception as e:
-                print(f"❌ Simulation error: {e}")
-                time.sleep(5)
+                time.sleep(self.tick_delay(consecutive_failures))  # Update every 5 seconds
+        except KeyboardInterrupt:
+            print("\n🛑 Simulation stopped by user")
+    
+    @staticmethod
+    def tick_delay(consecutive_failures):
+        """Seconds until the next tick, backing off after repeated failures"""
+        if consecutive_failures < FAILURES_BEFORE_BACKOFF:
+            return SIM_STEP_S
+        return min(MAX_BACKOFF_S, SIM_STEP_S * 2 ** (consecutive_failures - FAILURES_BEFORE_BACKOFF + 1))
 
 if __name__ == "__main__":
     hmi = PowerSystemHMI()
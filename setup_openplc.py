@@ -26,33 +26,52 @@ def wait_for_web_interface(host='openplc', port=8080, timeout=60):
     print(f"Timeout waiting for OpenPLC web interface after {timeout} seconds")
     return False
 
+# breaker_control_complete.st writes this signature to %MW0, which OpenPLC
+# serves as holding register 1024
+PROGRAM_TAG_REGISTER = 1024
+PROGRAM_TAG = 0xBC01
+
 def check_modbus_server(host='openplc', port=502, timeout=30):
-    """Check if Modbus TCP server is responding"""
+    """Wait until the Modbus TCP server is serving breaker_control_complete.st"""
     print(f"Checking Modbus TCP server at {host}:{port}...")
     
+    # One client for the whole wait: an established connection is kept
+    # between probes and only dropped when it fails
     client = ModbusTcpClient(host, port=port)
     start_time = time.time()
+    next_report = 10
+    last_state = None
     
-    while time.time() - start_time < timeout:
-        try:
-            if client.connect():
-                # Try a simple read operation
-                result = client.read_coils(address=0, count=1)
-                if not result.isError():
-                    print("Modbus TCP server is ready and responding!")
-                    client.close()
-                    return True
+    try:
+        while time.time() - start_time < timeout:
+            try:
+                if client.connect():
+                    # Any running program answers reads; only ours sets the tag
+                    result = client.read_holding_registers(address=PROGRAM_TAG_REGISTER, count=1)
+                    if not result.isError() and result.registers[0] == PROGRAM_TAG:
+                        print("Modbus TCP server is ready and running breaker_control_complete.st!")
+                        return True
+                    if result.isError():
+                        state = "Modbus server connected but returned an error"
+                    else:
+                        state = f"holding register {PROGRAM_TAG_REGISTER} is {result.registers[0]:#06x}, not {PROGRAM_TAG:#06x}"
                 else:
-                    print(f"Modbus server connected but returned error: {result}")
-            else:
-                print("Could not connect to Modbus server, retrying...")
-        except Exception as e:
-            print(f"Modbus connection attempt failed: {e}")
-        
+                    state = "could not connect to Modbus server"
+            except Exception as e:
+                state = f"Modbus connection attempt failed: {e}"
+                client.close()
+            
+            # Report changes straight away, otherwise only every 10 seconds
+            elapsed = time.time() - start_time
+            if state != last_state or elapsed >= next_report:
+                print(f"   Still waiting: {state} ({int(elapsed)}/{timeout}s)")
+                last_state = state
+                next_report = elapsed + 10
+            time.sleep(2)
+    finally:
         client.close()
-        time.sleep(2)
     
-    print(f"Timeout waiting for Modbus TCP server after {timeout} seconds")
+    print(f"Timeout waiting for breaker_control_complete.st on Modbus after {timeout} seconds")
     return False
 
 def main():
@@ -71,20 +90,17 @@ def main():
     print("3. Go to 'Programs' and upload breaker_control_complete.st")
     print("4. Compile the program")
     print("5. Go to 'Runtime' and start the PLC")
-    print("6. The script will then check for Modbus connectivity")
+    print("6. This script detects the running program over Modbus automatically")
     print("="*50 + "\n")
     
-    # Wait for user to set up the PLC
-    input("Press Enter after you've uploaded and started the PLC program...")
-    
-    # Check Modbus server
-    if check_modbus_server():
+    # Wait (up to 5 minutes) for the PLC program to come up
+    if check_modbus_server(timeout=300):
         print("SUCCESS: OpenPLC is fully configured and ready!")
         return True
     else:
-        print("ERROR: Modbus TCP server is not responding")
+        print("ERROR: breaker_control_complete.st is not running on the Modbus TCP server")
         print("Make sure you've:")
-        print("- Uploaded a PLC program")
+        print("- Uploaded breaker_control_complete.st")
         print("- Compiled it successfully")
         print("- Started the runtime")
         return False
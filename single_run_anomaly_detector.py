@@ -4,13 +4,108 @@ Single-run anomaly detector for testing.
 This runs the anomaly detection once and exits, rather than monitoring continuously.
 """
 
+import numpy as np
 import pandas as pd
-from adtk.data import validate_series
-from adtk.detector import OutlierDetector
-from sklearn.neighbors import LocalOutlierFactor
 import os
 import sys
 
+# Record layout of the binary sidecar written by physical_process_enhanced.py
+LOG_RECORD = np.dtype([('ts', '<i8'), ('loading_percent', '<f4')])
+
+def read_binary_log(path):
+    """Attach the binary power-flow log as a DataFrame indexed by timestamp."""
+    n_records = os.path.getsize(path) // LOG_RECORD.itemsize
+    if n_records == 0:
+        return pd.DataFrame({"loading_percent": []}, index=pd.DatetimeIndex([], name="timestamp"))
+    records = np.memmap(path, dtype=LOG_RECORD, mode='r', shape=(n_records,))
+    return pd.DataFrame(
+        {"loading_percent": records['loading_percent'].astype(np.float64)},
+        index=pd.DatetimeIndex(records['ts'].astype('datetime64[us]'), name="timestamp")
+    )
+
+def read_csv_log(path):
+    """Parse the text power-flow log as a DataFrame indexed by timestamp."""
+    # isoformat() drops the fraction when microsecond == 0, so a
+    # fixed strptime pattern won't do; ISO8601 stays on the fast path
+    return pd.read_csv(
+        path,
+        header=None,
+        names=["timestamp", "loading_percent"],
+        index_col="timestamp",
+        parse_dates=["timestamp"],
+        date_format="ISO8601",
+        dtype={"loading_percent": "float64"},
+        engine="c"
+    )
+
+def first_csv_timestamp(path):
+    """Timestamp of the first record in the text log, or None if it is empty."""
+    with open(path) as f:
+        first = f.readline()
+    return pd.Timestamp(first.split(",", 1)[0]) if first.strip() else None
+
+def last_csv_timestamp(path):
+    """Timestamp of the last record in the text log, or None if it is empty."""
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - 4096))
+        lines = f.read().splitlines()
+    last = next((line for line in reversed(lines) if line.strip()), None)
+    return pd.Timestamp(last.split(b",", 1)[0].decode()) if last else None
+
+def read_power_flow_log(path):
+    """Load the power-flow log, preferring the binary sidecar (no text/date parsing).
+
+    The sidecar only exists from the version that started writing it, so on
+    an install upgraded in place the CSV holds older history; those rows are
+    taken from the CSV and prepended. A sidecar that stops short of the
+    CSV's last record (left over from another run) is ignored.
+    """
+    bin_path = path + ".bin"
+    if not os.path.exists(bin_path):
+        return read_csv_log(path)
+    
+    data = read_binary_log(bin_path)
+    csv_end = last_csv_timestamp(path)
+    if csv_end is not None and (data.empty or data.index[-1] < csv_end):
+        return read_csv_log(path)
+    csv_start = first_csv_timestamp(path)
+    if csv_start is None or (not data.empty and csv_start >= data.index[0]):
+        return data
+    
+    history = read_csv_log(path)
+    if data.empty:
+        return history
+    return pd.concat([history[history.index < data.index[0]], data])
+
+# Rolling robust z-score: flag points more than ZSCORE_LIMIT scaled MADs
+# from the median of the trailing window
+WINDOW = 60
+MIN_PERIODS = 10
+ZSCORE_LIMIT = 3.5
+MAD_SCALE = 1.4826  # MAD -> standard deviation for normally distributed data
+
+def rolling_mad(series, median):
+    """Trailing-window median absolute deviation around `median`, without a per-row callback."""
+    values = series.to_numpy(dtype=np.float64)
+    # Left-pad so row i sees the WINDOW values ending at i, like rolling()
+    padded = np.concatenate([np.full(WINDOW - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, WINDOW)
+    deviations = np.abs(windows - median.to_numpy()[:, None])
+    mad = np.full(len(values), np.nan)
+    # Rows short of MIN_PERIODS already have a NaN median
+    ready = ~np.isnan(median.to_numpy())
+    mad[ready] = np.nanmedian(deviations[ready], axis=1)
+    return pd.Series(mad, index=series.index)
+
+def detect_outliers(series):
+    """Boolean Series marking robust z-score outliers in a loading series."""
+    if series.empty:
+        return series.astype(bool)
+    median = series.rolling(window=WINDOW, min_periods=MIN_PERIODS).median()
+    mad = rolling_mad(series, median)
+    score = (series - median).abs() / (MAD_SCALE * mad)
+    return score > ZSCORE_LIMIT
+
 def run_single_anomaly_detection():
     """Run anomaly detection once on the current log data."""
     
@@ -30,14 +125,7 @@ def run_single_anomaly_detection():
         return False
     
     try:
-        # Read the data
-        data = pd.read_csv(
-            LOG_FILE,
-            header=None,
-            names=["timestamp", "loading_percent"],
-            index_col="timestamp",
-            parse_dates=["timestamp"]
-        )
+        data = read_power_flow_log(LOG_FILE)
 
         if data.empty:
             print("❌ No data in log file")
@@ -58,17 +146,14 @@ def run_single_anomaly_detection():
         print(f"📊 Average loading: {active_data['loading_percent'].mean():.1f}%")
         print(f"📊 Data time range: {active_data.index.min()} to {active_data.index.max()}")
 
-        # Validate the time series for ADTK
-        s = validate_series(active_data["loading_percent"])
-        
-        # Convert to DataFrame for ADTK
-        df_data = pd.DataFrame(s, columns=['loading_percent'])
+        # Time-ordered series, one value per timestamp
+        s = active_data["loading_percent"].sort_index()
+        s = s[~s.index.duplicated(keep="last")]
         
         print(f"\n🔍 Running anomaly detection...")
         
-        # Create and run anomaly detector
-        outlier_detector = OutlierDetector(LocalOutlierFactor(contamination=0.1))
-        anomalies = outlier_detector.fit_detect(df_data)
+        # Flag outliers against the rolling median/MAD
+        anomalies = detect_outliers(s)
 
         # Process results
         if isinstance(anomalies, pd.Series):
@@ -2,17 +2,26 @@
 Standalone SCADA Web Dashboard - Runs outside Docker
 Connects to OpenPLC container running on localhost:502
 """
+# Patch blocking stdlib I/O first so Modbus sockets and sleeps yield to
+# the eventlet hub that serves Socket.IO clients
+import eventlet
+eventlet.monkey_patch()
+
 import pandapower as pp
 import pandas as pd
 import numpy as np
+import orjson
 from pymodbus.client import ModbusTcpClient
 import time
-import threading
 import json
 import os
+import socket
 import sys
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from flask import Flask, render_template, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_socketio import SocketIO, emit
 import logging
 
@@ -31,32 +40,34 @@ logger = logging.getLogger(__name__)
 if QUIET_MODE:
     log = logging.getLogger('werkzeug')
     log.setLevel(logging.ERROR)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider on orjson; also encodes Socket.IO packets.
+    Numpy scalars/arrays and datetimes serialize natively, NaN becomes null."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
     
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'scada_secret_key_2025'
-socketio = SocketIO(app, cors_allowed_origins="*", logger=False, engineio_logger=False)
-import pandapower as pp
-import pandas as pd
-import numpy as np
-from pymodbus.client import ModbusTcpClient
-import time
-import threading
-import json
-from datetime import datetime
-from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO, emit
-import logging
-import os
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+app.json = OrjsonProvider(app)
+socketio = SocketIO(app, async_mode='eventlet', json=app.json, cors_allowed_origins="*", logger=False, engineio_logger=False)
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'scada_secret_key_2025'
-socketio = SocketIO(app, cors_allowed_origins="*", logger=False, engineio_logger=False)
+# Daily load shape: the worker advances simulation_time in 5 s steps and
+# 10 s = 1 hour, so there are only 48 distinct hours of day per cycle
+SIM_STEP_S = 5
+PROFILE_HOURS = np.arange(48) * SIM_STEP_S / 10
+INDUSTRIAL_PROFILE = 0.7 + 0.3 * (1 + np.sin(2 * np.pi * (PROFILE_HOURS - 6) / 24))
+RESIDENTIAL_PROFILE = 0.4 + 0.6 * (1 + np.sin(2 * np.pi * (PROFILE_HOURS - 19) / 24)) ** 2
+BUSINESS_HOURS = (PROFILE_HOURS >= 8) & (PROFILE_HOURS <= 18)
 
 class StandaloneSCADA:
+    # Loads are the only per-cycle change while the breaker holds, so the
+    # stored Ybus can be reused and just the bus injections refreshed
+    PF_RECYCLE = {"bus_pq": True, "trafo": False, "gen": False}
+    
     def __init__(self):
         self.grid_data = {}
         self.plc_status = {
@@ -64,7 +75,7 @@ class StandaloneSCADA:
             'last_update': None,
             'breaker_state': False,
             'connection_attempts': 0,
-            'errors': []
+            'errors': deque(maxlen=100)  # Most recent PLC errors only
         }
         self.system_metrics = {
             'uptime': datetime.now(),
@@ -72,10 +83,17 @@ class StandaloneSCADA:
             'error_count': 0
         }
         self.client = None
+        # Latest snapshot of the PLC's first 8 output coils (%QX0.0-%QX0.7)
+        self.plc_coils = [False] * 8
         self.net = None
         self.running = False
         self.simulation_data = {}
         self.simulation_time = 0
+        # Standard normal draws for one cycle: commercial jitter, noise for
+        # the three loads, then the system frequency deviation
+        self._rng = np.random.default_rng()
+        self._noise = np.empty(5)
+        self._solved_breaker_state = None
         self.initialize_grid()
 
     def initialize_grid(self):
@@ -118,10 +136,44 @@ class StandaloneSCADA:
             self.breaker_switch = pp.create_switch(self.net, bus=self.bus_mv1, element=self.critical_line, 
                                                  et="l", closed=True, name="PLC Circuit Breaker")
             
+            self._build_result_rows()
+            
             logger.info("Enhanced grid model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize grid model: {e}")
             self.system_metrics['error_count'] += 1
+            return
+        
+        # Warm-up solve so numba compiles the NR kernels before the first cycle
+        try:
+            pp.runpp(self.net, numba=True)
+            self._solved_breaker_state = self.net.switch.at[0, 'closed']
+        except Exception as e:
+            logger.warning(f"Power flow warm-up failed: {e}")
+
+    def _build_result_rows(self):
+        """Create the per-element rows of the simulation data once. Names and
+        ratings never change; run_power_flow overwrites the solved values in
+        place each cycle (keys are listed up front to fix their order)"""
+        net = self.net
+        bus_names = net.bus['name']
+        self._bus_rows = [
+            {'name': name, 'voltage_kv': vn_kv, 'voltage_pu': None, 'angle_deg': None, 'voltage_actual': None}
+            for name, vn_kv in zip(bus_names, net.bus['vn_kv'].tolist())
+        ]
+        self._line_rows = [
+            {'name': name, 'from_bus': bus_names.at[from_bus], 'to_bus': bus_names.at[to_bus],
+             'p_from_mw': None, 'q_from_mvar': None, 'loading_percent': None, 'current_ka': None}
+            for name, from_bus, to_bus in zip(net.line['name'], net.line['from_bus'], net.line['to_bus'])
+        ]
+        self._load_rows = [
+            {'name': name, 'bus': bus_names.at[bus], 'p_mw': None, 'q_mvar': None}
+            for name, bus in zip(net.load['name'], net.load['bus'])
+        ]
+        self._gen_rows = [
+            {'name': name, 'bus': bus_names.at[bus], 'p_mw': None, 'q_mvar': None}
+            for name, bus in zip(net.gen['name'], net.gen['bus'])
+        ]
 
     def connect_to_plc(self):
         """Connect to OpenPLC running in Docker container"""
@@ -131,6 +183,8 @@ class StandaloneSCADA:
             connected = self.client.connect()
             
             if connected:
+                # Small request/response traffic: send each poll immediately
+                self.client.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                 self.plc_status['connected'] = True
                 self.plc_status['last_update'] = datetime.now()
                 logger.info("Successfully connected to OpenPLC container")
@@ -153,12 +207,15 @@ class StandaloneSCADA:
             return False
 
         try:
-            result = self.client.read_coils(address=0, count=1)
+            # One request for the whole coil byte; the breaker is %QX0.0 and
+            # the other outputs come along for free
+            result = self.client.read_coils(address=0, count=8)
             if result.isError():
                 logger.error(f"Error reading PLC coils: {result}")
                 return False
             
-            self.plc_status['breaker_state'] = result.bits[0]
+            self.plc_coils = result.bits[:8]
+            self.plc_status['breaker_state'] = self.plc_coils[0]
             self.plc_status['last_update'] = datetime.now()
             return True
             
@@ -169,23 +226,26 @@ class StandaloneSCADA:
 
     def update_dynamic_loads(self):
         """Update loads with realistic time-varying patterns"""
-        # Simulate daily load patterns (accelerated time)
-        hour_of_day = (self.simulation_time / 10) % 24  # 10 seconds = 1 hour
+        # Simulate daily load patterns (accelerated time, 10 seconds = 1 hour)
+        tick = int(self.simulation_time // SIM_STEP_S) % len(PROFILE_HOURS)
+        
+        # Every random draw for this cycle in one call
+        self._rng.standard_normal(out=self._noise)
         
         # Industrial load (stable, peak during work hours)
-        industrial_factor = 0.7 + 0.3 * (1 + np.sin(2 * np.pi * (hour_of_day - 6) / 24))
+        industrial_factor = INDUSTRIAL_PROFILE[tick]
         
         # Commercial load (peak during business hours)
-        if 8 <= hour_of_day <= 18:
-            commercial_factor = 0.9 + 0.2 * np.random.normal(0, 0.1)
+        if BUSINESS_HOURS[tick]:
+            commercial_factor = 0.9 + 0.2 * 0.1 * self._noise[0]
         else:
-            commercial_factor = 0.3 + 0.1 * np.random.normal(0, 0.1)
+            commercial_factor = 0.3 + 0.1 * 0.1 * self._noise[0]
         
         # Residential load (peak evening)
-        residential_factor = 0.4 + 0.6 * (1 + np.sin(2 * np.pi * (hour_of_day - 19) / 24)) ** 2
+        residential_factor = RESIDENTIAL_PROFILE[tick]
         
         # Add some random variation
-        noise = 0.05 * np.random.normal(0, 1, 3)
+        noise = 0.05 * self._noise[1:4]
         
         # Update loads
         self.net.load.loc[0, 'p_mw'] = max(0.2, 0.8 * industrial_factor + noise[0])
@@ -213,71 +273,63 @@ class StandaloneSCADA:
             # Update dynamic loads
             self.update_dynamic_loads()
             
-            # Run power flow
-            pp.runpp(self.net, algorithm="nr", max_iteration=20)
+            # Run power flow, recycling the admittance matrix and starting
+            # from the last solution unless the breaker moved (recycle does
+            # not pick up switch changes)
+            solved = False
+            if breaker_state == self._solved_breaker_state:
+                try:
+                    pp.runpp(self.net, algorithm="nr", max_iteration=8, numba=True,
+                             recycle=self.PF_RECYCLE, init="results")
+                    solved = True
+                except pp.LoadflowNotConverged:
+                    logger.warning("Warm-started power flow diverged, retrying with a full solve")
+            if not solved:
+                pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=True)
+            self._solved_breaker_state = breaker_state
+            
+            # Overwrite the solved values in the per-element rows
+            net = self.net
+            vm = net.res_bus['vm_pu'].to_numpy()
+            for row, vm_pu, va_degree, actual in zip(
+                    self._bus_rows, vm.tolist(), net.res_bus['va_degree'].tolist(),
+                    (vm * net.bus['vn_kv'].to_numpy()).tolist()):
+                row['voltage_pu'] = vm_pu
+                row['angle_deg'] = va_degree
+                row['voltage_actual'] = actual
+            
+            for row, (p_from_mw, q_from_mvar, loading_percent, current_ka) in zip(
+                    self._line_rows,
+                    net.res_line[['p_from_mw', 'q_from_mvar', 'loading_percent', 'i_from_ka']].to_numpy().tolist()):
+                row['p_from_mw'] = p_from_mw
+                row['q_from_mvar'] = q_from_mvar
+                row['loading_percent'] = loading_percent
+                row['current_ka'] = current_ka
+            
+            for row, p_mw, q_mvar in zip(self._load_rows, net.load['p_mw'].tolist(), net.load['q_mvar'].tolist()):
+                row['p_mw'] = p_mw
+                row['q_mvar'] = q_mvar
+            
+            for row, p_mw, q_mvar in zip(self._gen_rows, net.res_gen['p_mw'].tolist(), net.res_gen['q_mvar'].tolist()):
+                row['p_mw'] = p_mw
+                row['q_mvar'] = q_mvar
             
             # Create comprehensive simulation data
             self.simulation_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': datetime.now().isoformat(timespec='milliseconds'),
                 'breaker_state': breaker_state,
                 'breaker_status': 'CLOSED' if breaker_state else 'OPEN',
-                'system_frequency': 60.0 + np.random.normal(0, 0.02),
-                'buses': [],
-                'lines': [],
-                'loads': [],
-                'generators': [],
+                'system_frequency': 60.0 + 0.02 * self._noise[4],
+                'buses': self._bus_rows,
+                'lines': self._line_rows,
+                'loads': self._load_rows,
+                'generators': self._gen_rows,
                 'power_flow': {}
             }
             
-            # Bus voltages
-            for idx, bus in self.net.bus.iterrows():
-                bus_data = {
-                    'name': bus['name'],
-                    'voltage_kv': bus['vn_kv'],
-                    'voltage_pu': self.net.res_bus.loc[idx, 'vm_pu'],
-                    'angle_deg': self.net.res_bus.loc[idx, 'va_degree'],
-                    'voltage_actual': self.net.res_bus.loc[idx, 'vm_pu'] * bus['vn_kv']
-                }
-                self.simulation_data['buses'].append(bus_data)
-            
-            # Line flows
-            for idx, line in self.net.line.iterrows():
-                if idx in self.net.res_line.index:
-                    line_data = {
-                        'name': line['name'],
-                        'from_bus': self.net.bus.loc[line['from_bus'], 'name'],
-                        'to_bus': self.net.bus.loc[line['to_bus'], 'name'],
-                        'p_from_mw': self.net.res_line.loc[idx, 'p_from_mw'],
-                        'q_from_mvar': self.net.res_line.loc[idx, 'q_from_mvar'],
-                        'loading_percent': self.net.res_line.loc[idx, 'loading_percent'],
-                        'current_ka': self.net.res_line.loc[idx, 'i_from_ka']
-                    }
-                    self.simulation_data['lines'].append(line_data)
-            
-            # Load information
-            for idx, load in self.net.load.iterrows():
-                load_data = {
-                    'name': load['name'],
-                    'bus': self.net.bus.loc[load['bus'], 'name'],
-                    'p_mw': load['p_mw'],
-                    'q_mvar': load['q_mvar']
-                }
-                self.simulation_data['loads'].append(load_data)
-            
-            # Generator information
-            for idx, gen in self.net.gen.iterrows():
-                if idx in self.net.res_gen.index:
-                    gen_data = {
-                        'name': gen['name'],
-                        'bus': self.net.bus.loc[gen['bus'], 'name'],
-                        'p_mw': self.net.res_gen.loc[idx, 'p_mw'],
-                        'q_mvar': self.net.res_gen.loc[idx, 'q_mvar']
-                    }
-                    self.simulation_data['generators'].append(gen_data)
-            
             # Overall power flow summary
-            total_load = sum([load['p_mw'] for load in self.simulation_data['loads']])
-            total_generation = sum([gen['p_mw'] for gen in self.simulation_data['generators']])
+            total_load = float(net.load['p_mw'].to_numpy().sum())
+            total_generation = float(net.res_gen['p_mw'].to_numpy().sum())
             
             self.simulation_data['power_flow'] = {
                 'total_load_mw': total_load,
@@ -291,6 +343,7 @@ class StandaloneSCADA:
             
         except Exception as e:
             logger.error(f"Power flow calculation error: {e}")
+            self._solved_breaker_state = None
             self.system_metrics['error_count'] += 1
             return False
 
@@ -301,10 +354,10 @@ class StandaloneSCADA:
         return {
             'plc_status': {
                 'connected': self.plc_status['connected'],
-                'last_update': self.plc_status['last_update'].isoformat() if self.plc_status['last_update'] else None,
+                'last_update': self.plc_status['last_update'],
                 'breaker_state': self.plc_status['breaker_state'],
                 'connection_attempts': self.plc_status['connection_attempts'],
-                'recent_errors': self.plc_status['errors'][-3:] if self.plc_status['errors'] else []
+                'recent_errors': list(islice(reversed(self.plc_status['errors']), 3))[::-1]
             },
             'system_metrics': {
                 'uptime_seconds': uptime.total_seconds(),
@@ -315,9 +368,40 @@ class StandaloneSCADA:
             'simulation': self.simulation_data
         }
 
+# Per-row fields of the simulation tables that never change between cycles;
+# clients get them once in a full 'scada_update' and afterwards only receive
+# the remaining fields as 'scada_delta'
+STATIC_FIELDS = {
+    'buses': ('name', 'voltage_kv'),
+    'lines': ('name', 'from_bus', 'to_bus'),
+    'loads': ('name', 'bus'),
+    'generators': ('name', 'bus'),
+}
+
+def simulation_layout(sim):
+    """Row names of every simulation table; a delta only applies to the same layout"""
+    return tuple(tuple(row['name'] for row in sim.get(table, ())) for table in STATIC_FIELDS)
+
+def status_delta(status):
+    """Status without the static fields, tables sent as per-field value lists"""
+    sim = status['simulation']
+    delta_sim = {key: value for key, value in sim.items() if key not in STATIC_FIELDS}
+    for table, static in STATIC_FIELDS.items():
+        rows = sim.get(table, [])
+        fields = [field for field in (rows[0] if rows else ()) if field not in static]
+        delta_sim[table] = {field: [row[field] for row in rows] for field in fields}
+    return {
+        'plc_status': status['plc_status'],
+        'system_metrics': status['system_metrics'],
+        'simulation': delta_sim
+    }
+
 # Global SCADA instance
 scada = StandaloneSCADA()
 
+# Lines in one live console frame, redrawn in place every cycle
+CONSOLE_FRAME_LINES = 20
+
 def scada_worker():
     """Background worker thread"""
     if not QUIET_MODE:
@@ -330,7 +414,7 @@ def scada_worker():
             logger.info(f"Connecting to OpenPLC container (attempt {attempt + 1}/{max_retries})")
         if scada.connect_to_plc():
             break
-        time.sleep(2)
+        socketio.sleep(2)
     
     if not scada.plc_status['connected']:
         if not QUIET_MODE:
@@ -352,11 +436,11 @@ def scada_worker():
         print("="*80)
         
         # Reserve space for live display (move cursor down)
-        for _ in range(15):
-            print()
+        print("\n" * (CONSOLE_FRAME_LINES - 1))
     
     # Main loop
     cycle = 0
+    sent_layout = None
     while scada.running:
         try:
             cycle += 1
@@ -368,60 +452,65 @@ def scada_worker():
             # Run power flow
             scada.run_power_flow()
             
-            # Get status and emit to clients
+            # Get status and emit to clients: the full status whenever the
+            # grid layout differs from what clients last got, else a delta
             status = scada.get_system_status()
-            socketio.emit('scada_update', status)
+            layout = simulation_layout(status['simulation'])
+            if layout != sent_layout:
+                socketio.emit('scada_update', status)
+                sent_layout = layout
+            else:
+                socketio.emit('scada_delta', status_delta(status))
             
             # Display output based on mode
             sim = status['simulation']
             if sim:
                 if CONSOLE_MODE:
-                    # Clear previous output and move cursor up
-                    sys.stdout.write('\033[15A')  # Move cursor up 15 lines
-                    sys.stdout.write('\033[J')    # Clear from cursor to end of screen
-                    
-                    # Display live data in fixed position
-                    now = datetime.now().strftime('%H:%M:%S')
-                    print(f"⏰ Time: {now} | Cycle: {cycle:,}")
-                    print(f"🔌 Circuit Breaker: {sim['breaker_status']} ({'PLC' if scada.plc_status['connected'] else 'SIM'})")
-                    print(f"⚡ System Frequency: {sim['system_frequency']:.3f} Hz")
-                    print("")
-                    
-                    # Power summary
+                    # Build the whole frame, then redraw it in place with one
+                    # write so the terminal never shows a half-drawn frame
+                    now = time.strftime('%H:%M:%S')
                     pf = sim['power_flow']
-                    print(f"📊 POWER FLOW SUMMARY")
-                    print(f"   Total Load:       {pf['total_load_mw']:8.2f} MW")
-                    print(f"   Total Generation: {pf['total_generation_mw']:8.2f} MW")
-                    print(f"   Grid Import:      {pf['grid_import_mw']:8.2f} MW")
-                    print(f"   System Losses:    {pf['system_losses_mw']:8.2f} MW")
-                    print("")
-                    
-                    # Bus voltages
-                    print(f"🏗️  BUS VOLTAGES")
+                    lines = [
+                        f"⏰ Time: {now} | Cycle: {cycle:,}",
+                        f"🔌 Circuit Breaker: {sim['breaker_status']} ({'PLC' if scada.plc_status['connected'] else 'SIM'})",
+                        f"⚡ System Frequency: {sim['system_frequency']:.3f} Hz",
+                        "",
+                        
+                        # Power summary
+                        "📊 POWER FLOW SUMMARY",
+                        f"   Total Load:       {pf['total_load_mw']:8.2f} MW",
+                        f"   Total Generation: {pf['total_generation_mw']:8.2f} MW",
+                        f"   Grid Import:      {pf['grid_import_mw']:8.2f} MW",
+                        f"   System Losses:    {pf['system_losses_mw']:8.2f} MW",
+                        "",
+                        
+                        # Bus voltages
+                        "🏗️  BUS VOLTAGES",
+                    ]
                     for bus in sim['buses'][:3]:
-                        print(f"   {bus['name']:<18}: {bus['voltage_actual']:7.1f} kV ({bus['voltage_pu']:5.3f} pu)")
-                    print("")
+                        lines.append(f"   {bus['name']:<18}: {bus['voltage_actual']:7.1f} kV ({bus['voltage_pu']:5.3f} pu)")
+                    lines.append("")
                     
                     # Line status (if breaker closed)
+                    lines.append("🔗 CRITICAL LINE STATUS")
                     if sim['breaker_state'] and sim.get('lines'):
                         line = sim['lines'][0]
-                        print(f"🔗 CRITICAL LINE STATUS")
-                        print(f"   Power Flow:    {line['p_from_mw']:7.2f} MW")
-                        print(f"   Reactive:      {line['q_from_mvar']:7.2f} MVAR") 
-                        print(f"   Loading:       {line['loading_percent']:7.1f}%")
-                        print(f"   Current:       {line['current_ka']:7.3f} kA")
+                        lines += [
+                            f"   Power Flow:    {line['p_from_mw']:7.2f} MW",
+                            f"   Reactive:      {line['q_from_mvar']:7.2f} MVAR",
+                            f"   Loading:       {line['loading_percent']:7.1f}%",
+                            f"   Current:       {line['current_ka']:7.3f} kA",
+                        ]
                     else:
-                        print(f"🔗 CRITICAL LINE STATUS")
-                        print(f"   Status: DISCONNECTED (Breaker Open)")
-                        print("")
-                        print("")
-                        print("")
+                        lines += ["   Status: DISCONNECTED (Breaker Open)", "", "", ""]
                     
+                    # Move the cursor up over the previous frame and clear it
+                    sys.stdout.write(f"\033[{CONSOLE_FRAME_LINES}A\033[J" + "\n".join(lines) + "\n")
                     sys.stdout.flush()
                 
                 elif not QUIET_MODE:
                     # Regular scrolling output
-                    print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')}")
+                    print(f"\n⏰ {time.strftime('%H:%M:%S')}")
                     print(f"🔌 Breaker: {sim['breaker_status']}")
                     print(f"📊 Load: {sim['power_flow']['total_load_mw']:.2f} MW")
                     print(f"🏭 Import: {sim['power_flow']['grid_import_mw']:.2f} MW")
@@ -442,7 +531,7 @@ def scada_worker():
                 logger.error(f"SCADA worker error: {e}")
             scada.system_metrics['error_count'] += 1
         
-        time.sleep(5)
+        socketio.sleep(5)
 
 @app.route('/')
 def index():
@@ -478,23 +567,20 @@ if __name__ == '__main__':
             print("3. Dashboard will be available at http://localhost:5001")
         print("=" * 60)
     
-    # Start worker thread
-    worker_thread = threading.Thread(target=scada_worker, daemon=True)
-    worker_thread.start()
+    # Start worker as a background task on the Socket.IO event loop
+    socketio.start_background_task(scada_worker)
     
     # In console mode, don't start Flask server in main thread
     if CONSOLE_MODE:
-        # Start Flask in background thread
-        flask_thread = threading.Thread(
-            target=lambda: socketio.run(app, host='0.0.0.0', port=5001, debug=False, log_output=False),
-            daemon=True
+        # Start Flask in a background task
+        socketio.start_background_task(
+            socketio.run, app, host='0.0.0.0', port=5001, debug=False, log_output=False
         )
-        flask_thread.start()
         
         # Keep main thread alive for console display
         try:
             while True:
-                time.sleep(1)
+                socketio.sleep(1)
         except KeyboardInterrupt:
             print("\n🛑 Dashboard stopped by user")
             sys.exit(0)
@@ -6,60 +6,159 @@ This version runs without Docker and can be used for testing and debugging.
 
 import pandapower as pp
 import time
+import atexit
+import copy
+import functools
 import numpy as np
 import json
 from datetime import datetime
+import multiprocessing
 import os
+import queue
+import threading
+
+# pandapower's numba-compiled NR kernels; fall back to the SciPy path when
+# numba is not installed instead of letting every solve warn about it
+try:
+    from numba import njit
+    USE_NUMBA = True
+except ImportError:
+    USE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """Without numba, kernels below run as plain Python"""
+        return lambda func: func
+
+# Industrial, commercial and residential loads: base and minimum active
+# power, and the fixed Q/P ratio each one is drawn at
+LOAD_BASE_MW = np.array([0.8, 0.5, 2.1])
+LOAD_MIN_MW = np.array([0.2, 0.1, 0.5])
+LOAD_Q_RATIO = np.array([0.375, 0.4, 0.38])
+
+@njit(cache=True)
+def compute_load_setpoints(factors, noise):
+    """P/Q setpoints (MW/Mvar) for the three loads from their profile factors
+    and one tick's standard normal draws (noise[1:4] is the per-load noise)"""
+    p_mw = np.empty(3)
+    q_mvar = np.empty(3)
+    for i in range(3):
+        p_mw[i] = max(LOAD_MIN_MW[i], LOAD_BASE_MW[i] * factors[i] + 0.05 * noise[i + 1])
+        q_mvar[i] = p_mw[i] * LOAD_Q_RATIO[i]
+    return p_mw, q_mvar
+
+def daily_profile(hour_of_day):
+    """Industrial and residential load factors at the given hour(s) of day"""
+    industrial = 0.7 + 0.3 * (1 + np.sin(2 * np.pi * (hour_of_day - 6) / 24))
+    residential = 0.4 + 0.6 * (1 + np.sin(2 * np.pi * (hour_of_day - 19) / 24)) ** 2
+    return industrial, residential
+
+# The simulation advances in 5 s steps by default and 10 s = 1 hour, so the
+# daily shape only takes 48 distinct values: tabulate them once
+SIM_STEP_S = 5
+PROFILE_HOURS = np.arange(48) * SIM_STEP_S / 10
+INDUSTRIAL_PROFILE, RESIDENTIAL_PROFILE = daily_profile(PROFILE_HOURS)
+
+# Record layouts of the per-element metric tables (one row per bus, line,
+# load or generator); rows read like the dicts they replace, row['name']
+BUS_DTYPE = np.dtype([('name', 'U32'), ('voltage_kv', 'f8'), ('voltage_pu', 'f8'),
+                      ('angle_deg', 'f8'), ('voltage_actual', 'f8')])
+LINE_DTYPE = np.dtype([('name', 'U32'), ('from_bus', 'U32'), ('to_bus', 'U32'),
+                       ('p_from_mw', 'f8'), ('q_from_mvar', 'f8'), ('loading_percent', 'f8'),
+                       ('current_ka', 'f8'), ('max_current_ka', 'f8')])
+ELEMENT_DTYPE = np.dtype([('name', 'U32'), ('bus', 'U32'), ('p_mw', 'f8'), ('q_mvar', 'f8')])
 
 class PowerSystemHMI_Standalone:
-    def __init__(self, log_to_file=True):
+    # Only load P/Q changes between ticks with the same breaker state
+    PF_RECYCLE = {"bus_pq": True, "trafo": False, "gen": False}
+    
+    def __init__(self, log_to_file=True, seed=None):
         self.log_to_file = log_to_file
+        # Standard normal draws for one tick: commercial jitter, noise for
+        # the three loads, then the system frequency deviation
+        self._rng = np.random.default_rng(seed)
+        self._noise = np.empty(5)
         if self.log_to_file:
             # Use local directory for testing
             self.log_file = "./logs/power_flow.log"
             log_dir = os.path.dirname(self.log_file)
             if not os.path.exists(log_dir):
                 os.makedirs(log_dir)
+            # One line-buffered handle for the whole run instead of an
+            # open/close per sample, written by a background thread so
+            # file I/O never delays a tick
+            self._log_fp = open(self.log_file, "a", buffering=1)
+            self._log_queue = queue.Queue(maxsize=1024)
+            self._log_thread = threading.Thread(target=self._log_writer, daemon=True)
+            self._log_thread.start()
+            atexit.register(self._close_log)
         
         self.setup_power_system()
         self.simulation_time = 0
         print("✅ Standalone Power System HMI initialized successfully!")
         
-    def setup_power_system(self):
-        """Create a realistic power grid model with multiple measurement points"""
-        self.net = pp.create_empty_network(name="GridGuard Demo System")
+    def _log_writer(self):
+        """Write queued log lines until the None sentinel arrives"""
+        while (line := self._log_queue.get()) is not None:
+            self._log_fp.write(line)
+    
+    def _log_sample(self, line):
+        """Queue a log line without blocking the simulation"""
+        try:
+            self._log_queue.put_nowait(line)
+        except queue.Full:
+            # Writer fell behind: drop the oldest sample (the anomaly
+            # detector tolerates gaps) to make room for this one
+            try:
+                self._log_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._log_queue.put_nowait(line)
+    
+    def _close_log(self):
+        """Drain the queued lines, then close the log file"""
+        self._log_queue.put(None)
+        self._log_thread.join(timeout=5)
+        self._log_fp.close()
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _prototype_grid():
+        """Build the demo grid once per process. Returns the pristine net,
+        never solved or modified (instances work on deep copies), and the
+        element indices setup_power_system exposes as attributes."""
+        net = pp.create_empty_network(name="GridGuard Demo System")
         
         # Create buses (voltage levels)
-        self.bus_hv = pp.create_bus(self.net, vn_kv=138.0, name="HV Substation", type="n")
-        self.bus_mv1 = pp.create_bus(self.net, vn_kv=13.8, name="MV Bus 1", type="n")
-        self.bus_mv2 = pp.create_bus(self.net, vn_kv=13.8, name="MV Bus 2", type="n") 
-        self.bus_lv1 = pp.create_bus(self.net, vn_kv=0.48, name="Load Center 1", type="n")
-        self.bus_lv2 = pp.create_bus(self.net, vn_kv=0.48, name="Load Center 2", type="n")
+        bus_hv = pp.create_bus(net, vn_kv=138.0, name="HV Substation", type="n")
+        bus_mv1 = pp.create_bus(net, vn_kv=13.8, name="MV Bus 1", type="n")
+        bus_mv2 = pp.create_bus(net, vn_kv=13.8, name="MV Bus 2", type="n") 
+        bus_lv1 = pp.create_bus(net, vn_kv=0.48, name="Load Center 1", type="n")
+        bus_lv2 = pp.create_bus(net, vn_kv=0.48, name="Load Center 2", type="n")
         
         # External grid connection (infinite bus)
-        pp.create_ext_grid(self.net, bus=self.bus_hv, vm_pu=1.02, name="Transmission Grid")
+        pp.create_ext_grid(net, bus=bus_hv, vm_pu=1.02, name="Transmission Grid")
         
         # Transformers
-        pp.create_transformer(self.net, hv_bus=self.bus_hv, lv_bus=self.bus_mv1, 
+        pp.create_transformer(net, hv_bus=bus_hv, lv_bus=bus_mv1, 
                             std_type="25 MVA 110/20 kV", name="Main Transformer")
-        pp.create_transformer(self.net, hv_bus=self.bus_mv1, lv_bus=self.bus_lv1,
+        pp.create_transformer(net, hv_bus=bus_mv1, lv_bus=bus_lv1,
                             std_type="0.63 MVA 20/0.4 kV", name="Distribution Transformer 1")
-        pp.create_transformer(self.net, hv_bus=self.bus_mv2, lv_bus=self.bus_lv2,
+        pp.create_transformer(net, hv_bus=bus_mv2, lv_bus=bus_lv2,
                             std_type="0.63 MVA 20/0.4 kV", name="Distribution Transformer 2")
         
         # Loads with realistic and time-varying patterns
-        self.load1 = pp.create_load(self.net, bus=self.bus_lv1, p_mw=0.8, q_mvar=0.3, name="Industrial Load")
-        self.load2 = pp.create_load(self.net, bus=self.bus_lv2, p_mw=0.5, q_mvar=0.2, name="Commercial Load")
-        self.load3 = pp.create_load(self.net, bus=self.bus_mv2, p_mw=2.1, q_mvar=0.8, name="Residential Feeder")
+        load1 = pp.create_load(net, bus=bus_lv1, p_mw=0.8, q_mvar=0.3, name="Industrial Load")
+        load2 = pp.create_load(net, bus=bus_lv2, p_mw=0.5, q_mvar=0.2, name="Commercial Load")
+        load3 = pp.create_load(net, bus=bus_mv2, p_mw=2.1, q_mvar=0.8, name="Residential Feeder")
         
         # Generation
-        pp.create_gen(self.net, bus=self.bus_mv2, p_mw=1.5, vm_pu=1.0, name="Distributed Generator")
+        pp.create_gen(net, bus=bus_mv2, p_mw=1.5, vm_pu=1.0, name="Distributed Generator")
         
         # Critical transmission line with explicit parameters to fix loading calculation
-        self.critical_line = pp.create_line_from_parameters(
-            self.net, 
-            from_bus=self.bus_mv1, 
-            to_bus=self.bus_mv2,
+        critical_line = pp.create_line_from_parameters(
+            net, 
+            from_bus=bus_mv1, 
+            to_bus=bus_mv2,
             length_km=5.2,
             r_ohm_per_km=0.161,   # Resistance per km
             x_ohm_per_km=0.117,   # Reactance per km  
@@ -69,8 +168,51 @@ class PowerSystemHMI_Standalone:
         )
         
         # PLC-controlled circuit breaker
-        self.breaker_switch = pp.create_switch(self.net, bus=self.bus_mv1, element=self.critical_line, 
-                                             et="l", closed=True, name="PLC Circuit Breaker")
+        breaker_switch = pp.create_switch(net, bus=bus_mv1, element=critical_line, 
+                                        et="l", closed=True, name="PLC Circuit Breaker")
+        
+        return net, dict(bus_hv=bus_hv, bus_mv1=bus_mv1, bus_mv2=bus_mv2,
+                         bus_lv1=bus_lv1, bus_lv2=bus_lv2,
+                         load1=load1, load2=load2, load3=load3,
+                         critical_line=critical_line, breaker_switch=breaker_switch)
+    
+    def setup_power_system(self):
+        """Create a realistic power grid model with multiple measurement points"""
+        # Copy of the per-process prototype: the pp.create_* calls only run
+        # for the first instance
+        net, elements = self._prototype_grid()
+        self.net = copy.deepcopy(net)
+        vars(self).update(elements)
+        
+        # Metric tables with the static fields filled in, aligned with the
+        # result tables; each tick copies them and fills in the solution
+        bus_name = self.net.bus['name']
+        self._bus_table = np.zeros(len(self.net.bus), dtype=BUS_DTYPE)
+        self._bus_table['name'] = bus_name
+        self._bus_table['voltage_kv'] = self.net.bus['vn_kv']
+        self._line_table = np.zeros(len(self.net.line), dtype=LINE_DTYPE)
+        self._line_table['name'] = self.net.line['name']
+        self._line_table['from_bus'] = bus_name.loc[self.net.line['from_bus']]
+        self._line_table['to_bus'] = bus_name.loc[self.net.line['to_bus']]
+        self._line_table['max_current_ka'] = self.net.line['max_i_ka']
+        self._load_table = np.zeros(len(self.net.load), dtype=ELEMENT_DTYPE)
+        self._load_table['name'] = self.net.load['name']
+        self._load_table['bus'] = bus_name.loc[self.net.load['bus']]
+        self._gen_table = np.zeros(len(self.net.gen), dtype=ELEMENT_DTYPE)
+        self._gen_table['name'] = self.net.gen['name']
+        self._gen_table['bus'] = bus_name.loc[self.net.gen['bus']]
+        # Position of the critical line in metrics['lines'] (built in row order)
+        self._critical_line_pos = self.net.line.index.get_loc(self.critical_line)
+        
+        # Throwaway solve so the numba kernels (pandapower's and the load
+        # setpoint one) are compiled before the first tick
+        compute_load_setpoints(np.ones(3), np.zeros(5))
+        self._solved_breaker_state = None
+        try:
+            pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=USE_NUMBA)
+            self._solved_breaker_state = self.net.switch.at[0, 'closed']
+        except Exception as e:
+            print(f"❌ Power flow warm-up failed: {e}")
     
     def get_simulated_breaker_state(self):
         """Simulate breaker state for standalone testing"""
@@ -80,42 +222,53 @@ class PowerSystemHMI_Standalone:
     
     def update_dynamic_loads(self):
         """Update loads with realistic time-varying patterns"""
-        # Simulate daily load patterns
-        hour_of_day = (self.simulation_time / 10) % 24  # 10 seconds = 1 hour for demo
+        # Simulate daily load patterns (10 seconds = 1 hour for demo);
+        # industrial is stable with a work-hours peak, residential peaks
+        # in the evening
+        tick, offset = divmod(self.simulation_time, SIM_STEP_S)
+        if offset == 0:
+            tick = int(tick) % len(PROFILE_HOURS)
+            hour_of_day = PROFILE_HOURS[tick]
+            industrial_factor = INDUSTRIAL_PROFILE[tick]
+            residential_factor = RESIDENTIAL_PROFILE[tick]
+        else:
+            # Off the 5 s grid (custom update_interval): evaluate directly
+            hour_of_day = (self.simulation_time / 10) % 24
+            industrial_factor, residential_factor = daily_profile(hour_of_day)
         
-        # Industrial load (more stable, peak during work hours)
-        industrial_factor = 0.7 + 0.3 * (1 + np.sin(2 * np.pi * (hour_of_day - 6) / 24))
+        # Every random draw for this tick in one call
+        self._rng.standard_normal(out=self._noise)
         
         # Commercial load (peak during business hours)
         if 8 <= hour_of_day <= 18:
-            commercial_factor = 0.9 + 0.2 * np.random.normal(0, 0.1)
+            commercial_factor = 0.9 + 0.2 * 0.1 * self._noise[0]
         else:
-            commercial_factor = 0.3 + 0.1 * np.random.normal(0, 0.1)
-        
-        # Residential load (peak evening)
-        residential_factor = 0.4 + 0.6 * (1 + np.sin(2 * np.pi * (hour_of_day - 19) / 24)) ** 2
-        
-        # Add some random variation
-        noise = 0.05 * np.random.normal(0, 1, 3)
+            commercial_factor = 0.3 + 0.1 * 0.1 * self._noise[0]
         
-        # Update loads
-        self.net.load.loc[0, 'p_mw'] = max(0.2, 0.8 * industrial_factor + noise[0])
-        self.net.load.loc[1, 'p_mw'] = max(0.1, 0.5 * commercial_factor + noise[1])  
-        self.net.load.loc[2, 'p_mw'] = max(0.5, 2.1 * residential_factor + noise[2])
-        
-        # Update reactive power proportionally
-        self.net.load.loc[0, 'q_mvar'] = self.net.load.loc[0, 'p_mw'] * 0.375
-        self.net.load.loc[1, 'q_mvar'] = self.net.load.loc[1, 'p_mw'] * 0.4
-        self.net.load.loc[2, 'q_mvar'] = self.net.load.loc[2, 'p_mw'] * 0.38
+        # Update loads with some random variation, reactive power
+        # proportionally, as whole columns
+        factors = np.array([industrial_factor, commercial_factor, residential_factor])
+        p_mw, q_mvar = compute_load_setpoints(factors, self._noise)
+        self.net.load['p_mw'] = p_mw
+        self.net.load['q_mvar'] = q_mvar
     
     def run_power_flow(self):
         """Run power flow analysis and return results"""
+        breaker_state = self.net.switch.at[0, 'closed']
         try:
-            # Disable numba to avoid warnings
-            pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=False)
+            if breaker_state == self._solved_breaker_state:
+                # Same topology as the last solve: reuse its Ybus and only
+                # refresh the bus injections
+                pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=USE_NUMBA,
+                         recycle=self.PF_RECYCLE)
+            else:
+                # Breaker moved (or the last solve failed): full rebuild
+                pp.runpp(self.net, algorithm="nr", max_iteration=20, numba=USE_NUMBA)
+            self._solved_breaker_state = breaker_state
             return True
         except Exception as e:
             print(f"❌ Power flow convergence error: {e}")
+            self._solved_breaker_state = None
             return False
     
     def get_system_metrics(self):
@@ -134,10 +287,10 @@ class PowerSystemHMI_Standalone:
             
         # Extract metrics
         metrics = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.now(),  # formatted only where it is shown or logged
             'breaker_state': breaker_state,
             'breaker_status': 'CLOSED' if breaker_state else 'OPEN',
-            'system_frequency': 60.0 + np.random.normal(0, 0.02),  # Hz
+            'system_frequency': 60.0 + 0.02 * self._noise[4],  # Hz
             'buses': [],
             'lines': [],
             'loads': [],
@@ -145,79 +298,41 @@ class PowerSystemHMI_Standalone:
             'power_flow': {}
         }
         
-        # Bus voltages
-        for idx, bus in self.net.bus.iterrows():
-            vm_pu = self.net.res_bus.loc[idx, 'vm_pu']
-            va_degree = self.net.res_bus.loc[idx, 'va_degree']
-            
-            # Handle NaN values for isolated buses
-            if np.isnan(vm_pu):
-                vm_pu = 0.0
-            if np.isnan(va_degree):
-                va_degree = 0.0
-                
-            bus_data = {
-                'name': bus['name'],
-                'voltage_kv': bus['vn_kv'],
-                'voltage_pu': vm_pu,
-                'angle_deg': va_degree,
-                'voltage_actual': vm_pu * bus['vn_kv']
-            }
-            metrics['buses'].append(bus_data)
+        net = self.net
         
-        # Line flows
-        for idx, line in self.net.line.iterrows():
-            if idx in self.net.res_line.index:
-                loading_percent = self.net.res_line.loc[idx, 'loading_percent']
-                
-                # Handle NaN loading percentage (occurs when line is disconnected)
-                if np.isnan(loading_percent):
-                    # When breaker is open, set loading to 0
-                    loading_percent = 0.0
-                    current_ka = 0.0
-                    p_from_mw = 0.0
-                    q_from_mvar = 0.0
-                else:
-                    current_ka = self.net.res_line.loc[idx, 'i_from_ka']
-                    p_from_mw = self.net.res_line.loc[idx, 'p_from_mw']
-                    q_from_mvar = self.net.res_line.loc[idx, 'q_from_mvar']
-                
-                line_data = {
-                    'name': line['name'],
-                    'from_bus': self.net.bus.loc[line['from_bus'], 'name'],
-                    'to_bus': self.net.bus.loc[line['to_bus'], 'name'],
-                    'p_from_mw': p_from_mw,
-                    'q_from_mvar': q_from_mvar,
-                    'loading_percent': loading_percent,
-                    'current_ka': current_ka,
-                    'max_current_ka': self.net.line.loc[idx, 'max_i_ka']
-                }
-                metrics['lines'].append(line_data)
+        # Bus voltages (NaN for isolated buses is reported as 0)
+        vm = np.nan_to_num(net.res_bus['vm_pu'].to_numpy())
+        buses = self._bus_table.copy()
+        buses['voltage_pu'] = vm
+        buses['angle_deg'] = np.nan_to_num(net.res_bus['va_degree'].to_numpy())
+        buses['voltage_actual'] = vm * buses['voltage_kv']
+        metrics['buses'] = buses
+        
+        # Line flows; NaN loading means the line is disconnected (breaker
+        # open), in which case every flow is reported as 0
+        res_line = net.res_line
+        disconnected = np.isnan(res_line['loading_percent'].to_numpy())
+        lines = self._line_table.copy()
+        for field, col in (('loading_percent', 'loading_percent'), ('current_ka', 'i_from_ka'),
+                           ('p_from_mw', 'p_from_mw'), ('q_from_mvar', 'q_from_mvar')):
+            lines[field] = np.where(disconnected, 0.0, res_line[col].to_numpy())
+        metrics['lines'] = lines
         
         # Load information
-        for idx, load in self.net.load.iterrows():
-            load_data = {
-                'name': load['name'],
-                'bus': self.net.bus.loc[load['bus'], 'name'],
-                'p_mw': load['p_mw'],
-                'q_mvar': load['q_mvar']
-            }
-            metrics['loads'].append(load_data)
+        loads = self._load_table.copy()
+        loads['p_mw'] = net.load['p_mw'].to_numpy()
+        loads['q_mvar'] = net.load['q_mvar'].to_numpy()
+        metrics['loads'] = loads
         
         # Generator information
-        for idx, gen in self.net.gen.iterrows():
-            if idx in self.net.res_gen.index:
-                gen_data = {
-                    'name': gen['name'],
-                    'bus': self.net.bus.loc[gen['bus'], 'name'],
-                    'p_mw': self.net.res_gen.loc[idx, 'p_mw'],
-                    'q_mvar': self.net.res_gen.loc[idx, 'q_mvar']
-                }
-                metrics['generators'].append(gen_data)
+        gens = self._gen_table.copy()
+        gens['p_mw'] = net.res_gen['p_mw'].to_numpy()
+        gens['q_mvar'] = net.res_gen['q_mvar'].to_numpy()
+        metrics['generators'] = gens
         
         # Overall power flow summary
-        total_load = sum([load['p_mw'] for load in metrics['loads']])
-        total_generation = sum([gen['p_mw'] for gen in metrics['generators']])
+        total_load = float(loads['p_mw'].sum())
+        total_generation = float(gens['p_mw'].sum())
         
         metrics['power_flow'] = {
             'total_load_mw': total_load,
@@ -228,11 +343,13 @@ class PowerSystemHMI_Standalone:
         
         return metrics
     
-    def run_simulation(self, duration=60, update_interval=5):
-        """Main simulation loop"""
+    def run_simulation(self, duration=60, update_interval=5, verbose=True):
+        """Main simulation loop; verbose=False skips the per-tick console
+        summary (e.g. for benchmarking) but still logs every sample"""
         print("🚀 GridGuard SCADA Simulation Started (Standalone)")
         print("=" * 60)
         end_time = self.simulation_time + duration
+        next_tick = time.monotonic()
         
         while self.simulation_time < end_time:
             try:
@@ -240,44 +357,51 @@ class PowerSystemHMI_Standalone:
                 metrics = self.get_system_metrics()
                 
                 if metrics:
-                    # Print summary to console
-                    print(f"\n⏰ Time: {metrics['timestamp']}")
-                    print(f"🔌 Breaker State: {metrics['breaker_status']}")
-                    print(f"📊 Total Load: {metrics['power_flow']['total_load_mw']:.2f} MW")
-                    print(f"🏭 Grid Import: {metrics['power_flow']['grid_import_mw']:.2f} MW") 
-                    print(f"⚡ System Frequency: {metrics['system_frequency']:.2f} Hz")
+                    timestamp = metrics['timestamp'].isoformat()
                     
-                    # Show voltage levels
-                    for bus in metrics['buses'][:3]:  # Show first 3 buses
-                        if bus['voltage_pu'] == 0.0:
-                            print(f"   {bus['name']}: ISOLATED (breaker open)")
-                        else:
-                            print(f"   {bus['name']}: {bus['voltage_actual']:.1f} kV ({bus['voltage_pu']:.3f} pu)")
+                    critical_line = metrics['lines'][self._critical_line_pos]
                     
-                    critical_line = next((line for line in metrics['lines'] if line['name'] == "Critical Transmission Line"), None)
-                    
-                    if metrics['breaker_state'] and critical_line:
-                        print(f"🔗 Critical Line: {critical_line['p_from_mw']:.2f} MW, {critical_line['loading_percent']:.1f}% loading")
-                    else:
-                        print(f"🔗 Critical Line: DISCONNECTED (breaker open)")
+                    if verbose:
+                        # Print summary to console
+                        print(f"\n⏰ Time: {timestamp}")
+                        print(f"🔌 Breaker State: {metrics['breaker_status']}")
+                        print(f"📊 Total Load: {metrics['power_flow']['total_load_mw']:.2f} MW")
+                        print(f"🏭 Grid Import: {metrics['power_flow']['grid_import_mw']:.2f} MW") 
+                        print(f"⚡ System Frequency: {metrics['system_frequency']:.2f} Hz")
+                        
+                        # Show voltage levels
+                        for bus in metrics['buses'][:3]:  # Show first 3 buses
+                            if bus['voltage_pu'] == 0.0:
+                                print(f"   {bus['name']}: ISOLATED (breaker open)")
+                            else:
+                                print(f"   {bus['name']}: {bus['voltage_actual']:.1f} kV ({bus['voltage_pu']:.3f} pu)")
+                        
+                        if metrics['breaker_state']:
+                            print(f"🔗 Critical Line: {critical_line['p_from_mw']:.2f} MW, {critical_line['loading_percent']:.1f}% loading")
+                        else:
+                            print(f"🔗 Critical Line: DISCONNECTED (breaker open)")
                     
                     # Log data for anomaly detection
-                    if self.log_to_file and critical_line:
+                    if self.log_to_file:
                         if not np.isnan(critical_line['loading_percent']):
-                            timestamp = metrics['timestamp']
                             loading_percent = critical_line['loading_percent']
-                            with open(self.log_file, "a") as f:
-                                f.write(f"{timestamp},{loading_percent}\n")
+                            self._log_sample(f"{timestamp},{loading_percent}\n")
                         else:
                             # Log zero when breaker is open (no loading)
-                            timestamp = metrics['timestamp']
-                            with open(self.log_file, "a") as f:
-                                f.write(f"{timestamp},0.0\n")
+                            self._log_sample(f"{timestamp},0.0\n")
                 else:
                     print("❌ Failed to get system metrics")
                 
                 self.simulation_time += update_interval
-                time.sleep(update_interval)
+                
+                # Sleep until the next tick is due, so the time spent on this
+                # one doesn't stretch the cadence; after an overrun, restart
+                # the schedule from now rather than bursting to catch up
+                next_tick += update_interval
+                now = time.monotonic()
+                if next_tick < now:
+                    next_tick = now
+                time.sleep(next_tick - now)
                 
             except KeyboardInterrupt:
                 print("\n👋 Simulation stopped by user")
@@ -290,6 +414,23 @@ class PowerSystemHMI_Standalone:
         if self.log_to_file and os.path.exists(self.log_file):
             print(f"📁 Log file saved to: {self.log_file}")
 
+# Per-process simulator for run_parallel_sweep, built by the pool initializer
+_sweep_hmi = None
+
+def _init_sweep_worker():
+    global _sweep_hmi
+    _sweep_hmi = PowerSystemHMI_Standalone(log_to_file=False)
+
+def _sweep_tick(sim_time):
+    _sweep_hmi.simulation_time = sim_time
+    return _sweep_hmi.get_system_metrics()
+
+def run_parallel_sweep(sim_times, processes=None):
+    """Solve the grid at each simulation time, spread across worker processes.
+    Returns the metrics (None where the solve failed) in sim_times order."""
+    with multiprocessing.Pool(processes or os.cpu_count(), initializer=_init_sweep_worker) as pool:
+        return pool.map(_sweep_tick, sim_times)
+
 def main():
     """Run the standalone simulation"""
     try:
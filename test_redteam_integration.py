@@ -5,21 +5,21 @@ Test script to verify the red team ready PLC program works with GridGuard SCADA
 
 import sys
 import time
-import subprocess
+import socket
 
 def test_basic_connectivity():
     """Test basic PLC connectivity"""
     print("🔌 Testing PLC connectivity...")
     try:
-        # Try to ping the OpenPLC container
-        result = subprocess.run(["docker", "exec", "openplc_runtime", "netstat", "-ln"], 
-                              capture_output=True, text=True, timeout=10)
-        if "502" in result.stdout:
+        # docker-compose publishes Modbus on the host, so connect to it
+        # directly (as start.sh does) instead of exec'ing netstat in the
+        # container
+        with socket.create_connection(("localhost", 502), timeout=2):
             print("✅ Modbus port 502 is listening")
             return True
-        else:
-            print("❌ Modbus port 502 not found")
-            return False
+    except ConnectionRefusedError:
+        print("❌ Modbus port 502 not found")
+        return False
     except Exception as e:
         print(f"❌ Error testing connectivity: {e}")
         return False
@@ -41,18 +41,19 @@ def test_anomaly_detector_integration():
     """Test that anomaly detector can still read the log files"""
     print("📊 Testing anomaly detector integration...")
     try:
-        # Check if log directory exists
+        # Create the log directory, or learn that it exists, in one call
         import os
-        if os.path.exists("./logs"):
-            print("✅ Logs directory exists")
-        else:
-            os.makedirs("./logs", exist_ok=True)
+        try:
+            os.mkdir("./logs")
             print("✅ Created logs directory")
+        except FileExistsError:
+            print("✅ Logs directory exists")
         
         # Check if power flow log exists
-        if os.path.exists("./logs/power_flow.log"):
+        try:
+            os.stat("./logs/power_flow.log")
             print("✅ Power flow log exists")
-        else:
+        except FileNotFoundError:
             print("ℹ️  Power flow log will be created when physical process starts")
         
         return True
@@ -64,9 +65,10 @@ def test_attack_vectors():
     """Test attack vector documentation"""
     print("🎯 Testing attack vector documentation...")
     try:
-        with open("RED_TEAM_ATTACK_GUIDE.md", "r") as f:
+        # Both markers are ASCII, so search the raw bytes without decoding
+        with open("RED_TEAM_ATTACK_GUIDE.md", "rb") as f:
             content = f.read()
-            if "ATTACK VECTORS" in content and "Modbus" in content:
+            if b"ATTACK VECTORS" in content and b"Modbus" in content:
                 print("✅ Red team attack guide is complete")
                 return True
             else:
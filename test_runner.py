@@ -10,6 +10,11 @@ import os
 import signal
 import sys
 
+# Without close_fds (and no preexec_fn/cwd), subprocess launches children via
+# posix_spawn instead of fork+exec; this script holds no descriptors worth
+# hiding from them
+SPAWN_KW = dict(close_fds=False)
+
 def run_quick_test():
     """Run a quick test to verify everything works"""
     print("🧪 Running Quick System Test...")
@@ -17,7 +22,7 @@ def run_quick_test():
     # Test the physical process
     result = subprocess.run([
         sys.executable, "test_physical_process.py", "--quick"
-    ], capture_output=True, text=True)
+    ], capture_output=True, text=True, **SPAWN_KW)
     
     if result.returncode == 0:
         print("✅ Physical process test passed!")
@@ -36,9 +41,10 @@ def run_full_test(duration=60):
     print("   Press Ctrl+C to stop early\n")
     
     # Clean up old logs
-    if os.path.exists("./logs/power_flow.log"):
-        os.remove("./logs/power_flow.log")
-        print("🧹 Cleaned up old log files")
+    for log_path in ("./logs/power_flow.log", "./logs/power_flow.log.bin"):
+        if os.path.exists(log_path):
+            os.remove(log_path)
+            print(f"🧹 Cleaned up old log file {log_path}")
     
     processes = []
     
@@ -47,7 +53,7 @@ def run_full_test(duration=60):
         print("🔌 Starting physical process simulator...")
         physical_process = subprocess.Popen([
             sys.executable, "test_physical_process.py"
-        ])
+        ], **SPAWN_KW)
         processes.append(physical_process)
         
         # Wait a bit for the log file to be created
@@ -57,7 +63,7 @@ def run_full_test(duration=60):
         print("🔍 Starting anomaly detector...")
         anomaly_detector = subprocess.Popen([
             sys.executable, "test_anomaly_detector.py"
-        ])
+        ], **SPAWN_KW)
         processes.append(anomaly_detector)
         
         # Let them run for the specified duration
@@ -92,7 +98,7 @@ def run_synthetic_anomaly_test():
     
     result = subprocess.run([
         sys.executable, "test_anomaly_detector.py", "--test"
-    ])
+    ], **SPAWN_KW)
     
     return result.returncode == 0
 
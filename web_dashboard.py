@@ -1,31 +1,62 @@
 """
 SCADA Web Dashboard - Real-time monitoring interface
 """
+# Patch blocking stdlib I/O first so Modbus sockets and sleeps yield to
+# the eventlet hub that serves Socket.IO clients
+import eventlet
+eventlet.monkey_patch()
+
 import pandapower as pp
-import pandas as pd
 import numpy as np
 from pymodbus.client import ModbusTcpClient
+import math
 import time
-import threading
-import json
+import os
+import orjson
+import atexit
+import queue
+import socket
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from flask import Flask, render_template, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_socketio import SocketIO, emit
 import logging
+import logging.handlers
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records go through a queue to a listener thread,
+# so the SCADA worker and request handlers never wait on stderr
+log_queue = queue.Queue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
 logger = logging.getLogger(__name__)
 
 # Connection management
 active_connections = set()
 MAX_CONNECTIONS = 5  # Limit concurrent connections
 
+# Written by physical_process_enhanced every simulation tick
+SIM_DATA_PATH = '/shared_data/scada_data.json'
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider on orjson; also encodes Socket.IO packets.
+    grid_data is keyed by pandapower's integer indices, so non-str keys
+    are allowed (written as strings, as the stdlib does)."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'scada_secret_key_2025'
-socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True, 
-                   transports=['websocket', 'polling'], 
-                   allow_upgrades=True)
+app.json = OrjsonProvider(app)
+socketio = SocketIO(app, async_mode='eventlet', json=app.json, cors_allowed_origins="*", logger=False, engineio_logger=False, 
+                   transports=['websocket'], 
+                   allow_upgrades=False)
 
 # Add CSP headers to allow JavaScript execution
 @app.after_request
@@ -41,7 +72,9 @@ class SCADASystem:
             'last_update': None,
             'breaker_state': False,
             'connection_attempts': 0,
-            'errors': []
+            # (time, exception) pairs, formatted when shown. Bounded: a PLC
+            # that stays down adds an entry every cycle
+            'errors': deque(maxlen=50)
         }
         self.system_metrics = {
             'uptime': datetime.now(),
@@ -49,8 +82,20 @@ class SCADASystem:
             'error_count': 0
         }
         self.client = None
+        # Latest snapshot of the PLC's first 8 output coils (%QX0.0-%QX0.7)
+        self.plc_coils = [False] * 8
         self.net = None
         self.running = False
+        # Status built by the last worker cycle, shared by every HTTP and
+        # WebSocket reader until the next one (rebinding is atomic)
+        self.latest_status = None
+        # Breaker state grid_data was solved for; loads are fixed, so the
+        # solution only changes when the breaker does
+        self._solved_breaker_state = None
+        # grid_data solved for each breaker position, reused on later flips
+        self._solutions = {}
+        # (file identity, parsed data) of the simulator's shared file
+        self._sim_cache = (None, None)
         self.initialize_grid()
 
     def initialize_grid(self):
@@ -79,18 +124,49 @@ class SCADASystem:
             sw = pp.create_switch(self.net, bus=bus2, element=line1, 
                                 et="l", closed=True, name="Circuit Breaker")
 
+            # Parts of grid_data that don't depend on the solution
+            self._bus_keys = [str(k) for k in self.net.bus.index]
+            self._line_keys = [str(k) for k in self.net.line.index]
+            self._grid_loads = {
+                'active_power': self.net.load.p_mw.to_dict(),
+                'reactive_power': self.net.load.q_mvar.to_dict()
+            }
+
             logger.info("Grid model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize grid model: {e}")
             self.system_metrics['error_count'] += 1
+            return
+
+        # Warm-up solve so numba compiles the solver kernels before the
+        # first cycle; it is also the solution for the breaker as built
+        try:
+            closed = bool(self.net.switch.at[0, 'closed'])
+            self._solutions[closed] = self._solve(closed)
+        except Exception as e:
+            logger.warning(f"Power flow warm-up failed: {e}")
 
     def connect_to_plc(self):
         """Establish connection to OpenPLC"""
         try:
-            self.client = ModbusTcpClient('openplc', port=502)
+            if self.client is None:
+                # Fail a stalled poll within one cycle rather than pymodbus' 3 s
+                self.client = ModbusTcpClient('openplc', port=502, timeout=2.0)
+            else:
+                # Reconnect on the same client instead of leaking its socket
+                self.client.close()
             connected = self.client.connect()
             
             if connected:
+                sock = self.client.socket
+                # Small request/response traffic: send each poll immediately
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                # Probe an idle link after 10 s, every 5 s, and drop it after
+                # 3 unanswered probes, so a vanished PLC is noticed
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 10)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 5)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
                 self.plc_status['connected'] = True
                 self.plc_status['last_update'] = datetime.now()
                 logger.info("Successfully connected to OpenPLC")
@@ -102,68 +178,65 @@ class SCADASystem:
                 
         except Exception as e:
             self.plc_status['connected'] = False
-            self.plc_status['errors'].append(f"{datetime.now()}: {str(e)}")
+            self._record_error(e)
             self.system_metrics['error_count'] += 1
             logger.error(f"PLC connection error: {e}")
             return False
 
-    def read_plc_data(self):
+    def _record_error(self, exc):
+        """Keep a PLC error for the status page; it is only formatted if
+        it is still among the recent ones when a status is built"""
+        self.plc_status['errors'].append((datetime.now(), exc.with_traceback(None)))
+
+    def read_plc_data(self, now=None):
         """Read data from PLC"""
-        if not self.client or not self.plc_status['connected']:
+        # Ask the client, not our flag: pymodbus drops the socket on I/O errors
+        if not self.client or not self.client.is_socket_open():
             return False
 
         try:
-            result = self.client.read_coils(address=0, count=1)
+            # One request for the whole coil byte; the breaker is %QX0.0 and
+            # the other outputs come along for free
+            result = self.client.read_coils(address=0, count=8)
             if result.isError():
                 logger.error(f"Error reading PLC coils: {result}")
                 return False
             
-            self.plc_status['breaker_state'] = result.bits[0]
-            self.plc_status['last_update'] = datetime.now()
+            self.plc_coils = result.bits[:8]
+            self.plc_status['breaker_state'] = self.plc_coils[0]
+            self.plc_status['last_update'] = now or datetime.now()
             self.plc_status['connection_attempts'] += 1
             return True
             
         except Exception as e:
             logger.error(f"Error reading PLC data: {e}")
-            self.plc_status['errors'].append(f"{datetime.now()}: {str(e)}")
+            self._record_error(e)
             self.system_metrics['error_count'] += 1
             return False
 
-    def run_power_flow(self):
+    def run_power_flow(self, now=None):
         """Run power flow calculation"""
         try:
             if self.net is None:
                 return False
+            timestamp = (now or datetime.now()).isoformat()
 
-            # Update switch state based on PLC
-            self.net.switch.loc[0, 'closed'] = self.plc_status['breaker_state']
+            breaker_state = bool(self.plc_status['breaker_state'])
+            if breaker_state == self._solved_breaker_state and self.grid_data:
+                # Same breaker, same loads: the last solution still holds
+                self.grid_data['timestamp'] = timestamp
+                self.system_metrics['total_cycles'] += 1
+                return True
             
-            # Run power flow
-            pp.runpp(self.net)
+            # Update switch state based on PLC
+            self.net.switch.loc[0, 'closed'] = breaker_state
             
-            # Extract results
-            self.grid_data = {
-                'timestamp': datetime.now().isoformat(),
-                'breaker_closed': bool(self.plc_status['breaker_state']),
-                'buses': {
-                    'count': len(self.net.bus),
-                    'voltage_data': {str(k): float(v) if not pd.isna(v) else 1.0 for k, v in self.net.res_bus.vm_pu.to_dict().items()} if hasattr(self.net, 'res_bus') else {}
-                },
-                'lines': {
-                    'count': len(self.net.line),
-                    'loading': {str(k): float(v) if not pd.isna(v) else 0.0 for k, v in self.net.res_line.loading_percent.to_dict().items()} if hasattr(self.net, 'res_line') else {},
-                    'power_flow': {
-                        'p_from_mw': {str(k): float(v) if not pd.isna(v) else 0.0 for k, v in self.net.res_line.p_from_mw.to_dict().items()} if hasattr(self.net, 'res_line') else {},
-                        'q_from_mvar': {str(k): float(v) if not pd.isna(v) else 0.0 for k, v in self.net.res_line.q_from_mvar.to_dict().items()} if hasattr(self.net, 'res_line') else {}
-                    }
-                },
-                'switches': self.net.switch.to_dict('records'),
-                'loads': {
-                    'active_power': self.net.load.p_mw.to_dict() if len(self.net.load) > 0 else {},
-                    'reactive_power': self.net.load.q_mvar.to_dict() if len(self.net.load) > 0 else {}
-                }
-            }
+            solution = self._solutions.get(breaker_state)
+            if solution is None:
+                solution = self._solutions[breaker_state] = self._solve(breaker_state)
+            self.grid_data = dict(solution, timestamp=timestamp)
             
+            self._solved_breaker_state = breaker_state
             self.system_metrics['total_cycles'] += 1
             return True
             
@@ -172,52 +245,97 @@ class SCADASystem:
             self.system_metrics['error_count'] += 1
             return False
 
-    def get_simulation_data(self):
+    def _solve(self, breaker_state):
+        """Solve net for the switch state already set on it and return the
+        grid_data for it; run_power_flow fills in the timestamp"""
+        # Radial feeder: the backward/forward sweep needs no Jacobian, and
+        # angles (only the trafo's phase shift) are not shown anywhere
+        pp.runpp(self.net, algorithm='bfsw', calculate_voltage_angles=False, numba=True)
+        
+        # Extract results (NaN voltages of isolated buses read as 1.0 pu,
+        # NaN flows of a disconnected line as 0)
+        res_line = self.net.res_line
+
+        def line_values(col):
+            return dict(zip(self._line_keys, np.nan_to_num(res_line[col].to_numpy()).tolist()))
+
+        return {
+            'timestamp': None,
+            'breaker_closed': breaker_state,
+            'buses': {
+                'count': len(self._bus_keys),
+                'voltage_data': dict(zip(self._bus_keys, np.nan_to_num(self.net.res_bus.vm_pu.to_numpy(), nan=1.0).tolist()))
+            },
+            'lines': {
+                'count': len(self._line_keys),
+                'loading': line_values('loading_percent'),
+                'power_flow': {
+                    'p_from_mw': line_values('p_from_mw'),
+                    'q_from_mvar': line_values('q_from_mvar')
+                }
+            },
+            'switches': self.net.switch.to_dict('records'),
+            'loads': self._grid_loads
+        }
+
+    def get_simulation_data(self, now=None):
         """Get enhanced simulation data from file"""
         try:
-            with open('/shared_data/scada_data.json', 'r') as f:
-                data = json.load(f)
-                return data
+            # The simulator replaces the file atomically on every write, so
+            # the same inode and mtime mean the last parse still holds
+            st = os.stat(SIM_DATA_PATH)
+            key = (st.st_ino, st.st_mtime_ns)
+            if key != self._sim_cache[0]:
+                with open(SIM_DATA_PATH, 'rb') as f:
+                    self._sim_cache = (key, orjson.loads(f.read()))
+            return self._sim_cache[1]
         except FileNotFoundError:
             # Return dynamic fallback data if file doesn't exist
-            import time
-            t = time.time()
+            now = now or datetime.now()
+            # Scalar waveforms: math.sin skips numpy's per-call ufunc dispatch
+            t = now.timestamp()
             return {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'breaker_state': self.plc_status.get('breaker_state', False),
                 'breaker_status': 'CLOSED' if self.plc_status.get('breaker_state', False) else 'OPEN',
-                'system_frequency': 60.0 + 0.05 * np.sin(t * 0.1),
+                'system_frequency': 60.0 + 0.05 * math.sin(t * 0.1),
                 'buses': [
-                    {'name': 'HV Substation', 'voltage_kv': 138.0, 'voltage_pu': 1.02 + 0.01*np.sin(t*0.05), 'voltage_actual': 138.0 * (1.02 + 0.01*np.sin(t*0.05))},
-                    {'name': 'MV Bus 1', 'voltage_kv': 13.8, 'voltage_pu': 0.98 + 0.015*np.sin(t*0.07), 'voltage_actual': 13.8 * (0.98 + 0.015*np.sin(t*0.07))},
-                    {'name': 'MV Bus 2', 'voltage_kv': 13.8, 'voltage_pu': 0.95 + 0.02*np.sin(t*0.03), 'voltage_actual': 13.8 * (0.95 + 0.02*np.sin(t*0.03))}
+                    {'name': 'HV Substation', 'voltage_kv': 138.0, 'voltage_pu': 1.02 + 0.01*math.sin(t*0.05), 'voltage_actual': 138.0 * (1.02 + 0.01*math.sin(t*0.05))},
+                    {'name': 'MV Bus 1', 'voltage_kv': 13.8, 'voltage_pu': 0.98 + 0.015*math.sin(t*0.07), 'voltage_actual': 13.8 * (0.98 + 0.015*math.sin(t*0.07))},
+                    {'name': 'MV Bus 2', 'voltage_kv': 13.8, 'voltage_pu': 0.95 + 0.02*math.sin(t*0.03), 'voltage_actual': 13.8 * (0.95 + 0.02*math.sin(t*0.03))}
                 ],
                 'loads': [
-                    {'name': 'Industrial Load', 'bus': 'Load Center 1', 'p_mw': 0.8 + 0.2*np.sin(t*0.02), 'q_mvar': 0.3 + 0.1*np.sin(t*0.02)},
-                    {'name': 'Commercial Load', 'bus': 'Load Center 2', 'p_mw': 0.5 + 0.3*np.sin(t*0.04), 'q_mvar': 0.2 + 0.12*np.sin(t*0.04)},
-                    {'name': 'Residential Feeder', 'bus': 'MV Bus 2', 'p_mw': 2.1 + 0.4*np.sin(t*0.01), 'q_mvar': 0.8 + 0.15*np.sin(t*0.01)}
+                    {'name': 'Industrial Load', 'bus': 'Load Center 1', 'p_mw': 0.8 + 0.2*math.sin(t*0.02), 'q_mvar': 0.3 + 0.1*math.sin(t*0.02)},
+                    {'name': 'Commercial Load', 'bus': 'Load Center 2', 'p_mw': 0.5 + 0.3*math.sin(t*0.04), 'q_mvar': 0.2 + 0.12*math.sin(t*0.04)},
+                    {'name': 'Residential Feeder', 'bus': 'MV Bus 2', 'p_mw': 2.1 + 0.4*math.sin(t*0.01), 'q_mvar': 0.8 + 0.15*math.sin(t*0.01)}
                 ],
                 'generators': [
-                    {'name': 'Distributed Generator', 'bus': 'MV Bus 2', 'p_mw': 1.5 + 0.2*np.sin(t*0.08), 'q_mvar': 0.3 + 0.1*np.cos(t*0.08)}
+                    {'name': 'Distributed Generator', 'bus': 'MV Bus 2', 'p_mw': 1.5 + 0.2*math.sin(t*0.08), 'q_mvar': 0.3 + 0.1*math.cos(t*0.08)}
                 ],
                 'lines': [
-                    {'name': 'Critical Transmission Line', 'from_bus': 'MV Bus 1', 'to_bus': 'MV Bus 2', 'p_from_mw': 1.2 + 0.3*np.sin(t*0.06), 'loading_percent': 45 + 15*np.sin(t*0.06), 'current_ka': 0.08 + 0.02*np.sin(t*0.06)}
+                    {'name': 'Critical Transmission Line', 'from_bus': 'MV Bus 1', 'to_bus': 'MV Bus 2', 'p_from_mw': 1.2 + 0.3*math.sin(t*0.06), 'loading_percent': 45 + 15*math.sin(t*0.06), 'current_ka': 0.08 + 0.02*math.sin(t*0.06)}
                 ],
                 'power_flow': {
-                    'total_load_mw': 3.4 + 0.6*np.sin(t*0.02),
-                    'total_generation_mw': 1.5 + 0.2*np.sin(t*0.08),
-                    'grid_import_mw': 1.9 + 0.4*np.sin(t*0.03),
-                    'system_losses_mw': 0.05 + 0.02*np.sin(t*0.1)
+                    'total_load_mw': 3.4 + 0.6*math.sin(t*0.02),
+                    'total_generation_mw': 1.5 + 0.2*math.sin(t*0.08),
+                    'grid_import_mw': 1.9 + 0.4*math.sin(t*0.03),
+                    'system_losses_mw': 0.05 + 0.02*math.sin(t*0.1)
                 }
             }
         except Exception as e:
             logger.error(f"Error reading simulation data: {e}")
             return None
 
-    def get_system_status(self):
+    def current_status(self):
+        """Status from the last worker cycle, built on demand before the first"""
+        status = self.latest_status
+        return status if status is not None else self.get_system_status()
+
+    def get_system_status(self, now=None):
         """Get current system status for web interface"""
-        uptime = datetime.now() - self.system_metrics['uptime']
-        sim_data = self.get_simulation_data()
+        now = now or datetime.now()
+        uptime = now - self.system_metrics['uptime']
+        sim_data = self.get_simulation_data(now)
         
         return {
             'plc_status': {
@@ -225,7 +343,7 @@ class SCADASystem:
                 'last_update': self.plc_status['last_update'].isoformat() if self.plc_status['last_update'] else None,
                 'breaker_state': self.plc_status['breaker_state'],
                 'connection_attempts': self.plc_status['connection_attempts'],
-                'recent_errors': self.plc_status['errors'][-5:] if self.plc_status['errors'] else []
+                'recent_errors': [f"{t}: {e}" for t, e in islice(reversed(self.plc_status['errors']), 5)][::-1]
             },
             'system_metrics': {
                 'uptime_seconds': uptime.total_seconds(),
@@ -238,6 +356,40 @@ class SCADASystem:
             'simulation': sim_data
         }
 
+# Per-row fields of the simulation tables that stay fixed between cycles;
+# clients get them in a full 'scada_update' and then only the values that
+# move, as 'scada_delta' (the same events standalone_dashboard sends)
+STATIC_FIELDS = {
+    'buses': ('name', 'voltage_kv'),
+    'lines': ('name', 'from_bus', 'to_bus'),
+    'loads': ('name', 'bus'),
+    'generators': ('name', 'bus'),
+}
+
+def simulation_layout(sim):
+    """Row names of every simulation table, None without simulation data"""
+    if not sim:
+        return None
+    return tuple(tuple(row['name'] for row in sim.get(table, ())) for table in STATIC_FIELDS)
+
+def status_delta(status, with_grid_data):
+    """Status without the static fields, tables sent as per-field value
+    lists; grid_data only when it is a new solution"""
+    sim = status['simulation']
+    delta_sim = {key: value for key, value in sim.items() if key not in STATIC_FIELDS}
+    for table, static in STATIC_FIELDS.items():
+        rows = sim.get(table, [])
+        fields = [field for field in (rows[0] if rows else ()) if field not in static]
+        delta_sim[table] = {field: [row[field] for row in rows] for field in fields}
+    delta = {
+        'plc_status': status['plc_status'],
+        'system_metrics': status['system_metrics'],
+        'simulation': delta_sim
+    }
+    if with_grid_data:
+        delta['grid_data'] = status['grid_data']
+    return delta
+
 # Global SCADA system instance
 scada_system = SCADASystem()
 
@@ -256,7 +408,7 @@ def scada_worker():
             logger.info(f"Attempting to connect to PLC (attempt {retry_count + 1}/{max_retries})")
             if scada_system.connect_to_plc():
                 break
-            time.sleep(3)
+            socketio.sleep(3)
             retry_count += 1
         
         if not scada_system.plc_status['connected']:
@@ -266,14 +418,21 @@ def scada_worker():
         
         # Main SCADA loop
         cycle_count = 0
+        # Simulation layout and grid_data object of the last broadcast;
+        # grid_data is only replaced when the breaker moves
+        sent_layout = None
+        sent_grid_data = None
+        next_cycle = time.monotonic()
         while scada_system.running:
             try:
                 cycle_count += 1
-                logger.info(f"SCADA cycle {cycle_count} starting...")
+                # One wall-clock sample stamps everything this cycle produces
+                now = datetime.now()
+                logger.debug("SCADA cycle %d starting...", cycle_count)
                 
                 # Read PLC data (or simulate if not connected)
                 if scada_system.plc_status['connected']:
-                    success = scada_system.read_plc_data()
+                    success = scada_system.read_plc_data(now)
                     if not success:
                         # Try to reconnect
                         logger.info("Attempting to reconnect to PLC...")
@@ -285,27 +444,44 @@ def scada_worker():
                         logger.info(f"Simulation mode: Breaker state = {scada_system.plc_status['breaker_state']}")
                 
                 # Run power flow calculation
-                logger.info("Running power flow calculation...")
-                power_flow_success = scada_system.run_power_flow()
-                logger.info(f"Power flow calculation: {'SUCCESS' if power_flow_success else 'FAILED'}")
+                logger.debug("Running power flow calculation...")
+                power_flow_success = scada_system.run_power_flow(now)
+                logger.debug("Power flow calculation: %s", 'SUCCESS' if power_flow_success else 'FAILED')
                 
                 # Get system status
-                logger.info("Getting system status...")
-                system_status = scada_system.get_system_status()
-                logger.info(f"System status retrieved: PLC={system_status['plc_status']['connected']}, Cycles={system_status['system_metrics']['total_cycles']}")
+                logger.debug("Getting system status...")
+                system_status = scada_system.get_system_status(now)
+                scada_system.latest_status = system_status
+                logger.debug("System status retrieved: PLC=%s, Cycles=%d", system_status['plc_status']['connected'], system_status['system_metrics']['total_cycles'])
                 
-                # Emit real-time data to web clients
-                logger.info("Emitting data to WebSocket clients...")
-                socketio.emit('scada_update', system_status)
-                logger.info("Data emitted successfully")
+                # Emit real-time data to web clients, if any are connected:
+                # the full status when the simulation layout changed, else
+                # a delta
+                if active_connections:
+                    logger.debug("Emitting data to WebSocket clients...")
+                    layout = simulation_layout(system_status['simulation'])
+                    grid_data = system_status['grid_data']
+                    if layout is None or layout != sent_layout:
+                        socketio.emit('scada_update', system_status)
+                        sent_layout = layout
+                    else:
+                        socketio.emit('scada_delta', status_delta(system_status, grid_data is not sent_grid_data))
+                    sent_grid_data = grid_data
+                    logger.debug("Data emitted successfully")
                 
             except Exception as e:
                 logger.error(f"Error in SCADA worker cycle {cycle_count}: {e}")
                 logger.error(f"Exception details: {type(e).__name__}: {str(e)}")
                 scada_system.system_metrics['error_count'] += 1
             
-            logger.info(f"SCADA cycle {cycle_count} complete, sleeping for 5 seconds...")
-            time.sleep(5)  # 5-second update cycle
+            # 5-second update cycle, timed from deadlines so the cycle's own
+            # work doesn't stretch it; after an overrun, restart from now
+            next_cycle += 5
+            now = time.monotonic()
+            if next_cycle < now:
+                next_cycle = now
+            logger.debug("SCADA cycle %d complete, sleeping for %.2f seconds...", cycle_count, next_cycle - now)
+            socketio.sleep(next_cycle - now)
             
     except Exception as e:
         logger.error(f"Fatal error in SCADA worker thread: {e}")
@@ -323,17 +499,29 @@ def test():
     """Simple test page"""
     return render_template('test.html')
 
+# /api/status body as (status, client list, JSON) it was serialized from;
+# pollers between two worker cycles all get the same bytes
+_status_body = (None, None, None)
+
 @app.route('/api/status')
 def api_status():
     """REST API endpoint for system status"""
-    status = scada_system.get_system_status()
-    # Add connection info
-    status['connections'] = {
-        'active_count': len(active_connections),
-        'max_allowed': MAX_CONNECTIONS,
-        'active_clients': list(active_connections)
-    }
-    return jsonify(status)
+    global _status_body
+    current = scada_system.current_status()
+    clients = list(active_connections)
+    built_from, built_clients, body = _status_body
+    if current is not built_from or clients != built_clients:
+        # Shallow copy: the cached status is shared with other readers
+        status = dict(current)
+        # Add connection info
+        status['connections'] = {
+            'active_count': len(clients),
+            'max_allowed': MAX_CONNECTIONS,
+            'active_clients': clients
+        }
+        body = app.json.dumps(status)
+        _status_body = (current, clients, body)
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/grid-data')
 def api_grid_data():
@@ -356,7 +544,7 @@ def handle_connect(auth):
     logger.info(f'Client connected to WebSocket: {client_id} (Total connections: {len(active_connections)})')
     
     try:
-        emit('scada_update', scada_system.get_system_status())
+        emit('scada_update', scada_system.current_status())
         logger.info(f'Initial data sent to client: {client_id}')
     except Exception as e:
         logger.error(f'Error sending initial data to client {client_id}: {e}')
@@ -399,9 +587,8 @@ def handle_toggle_breaker():
         emit('status', {'error': 'PLC not connected'})
 
 if __name__ == '__main__':
-    # Start the SCADA worker thread
-    worker_thread = threading.Thread(target=scada_worker, daemon=True)
-    worker_thread.start()
+    # Start the SCADA worker as a background task of the async mode
+    socketio.start_background_task(scada_worker)
     
     logger.info("Starting SCADA Web Dashboard on http://0.0.0.0:5001")
     socketio.run(app, host='0.0.0.0', port=5001, debug=False)